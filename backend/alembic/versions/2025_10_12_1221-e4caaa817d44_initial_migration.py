@@ -7,6 +7,7 @@ Create Date: 2025-10-12 12:21:32.084529
 """
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
 
 
 # revision identifiers, used by Alembic.
@@ -17,12 +18,26 @@ depends_on = None
 
 
 def upgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    # Databases bootstrapped by the old Base.metadata.create_all already have the table
+    if sa.inspect(op.get_bind()).has_table('page_visits'):
+        return
+
+    op.create_table(
+        'page_visits',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('url', sa.Text(), nullable=False),
+        sa.Column('datetime_visited', sa.DateTime(), nullable=False),
+        sa.Column('link_count', sa.Integer(), nullable=False),
+        sa.Column('word_count', sa.Integer(), nullable=False),
+        sa.Column('image_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_url_datetime', 'page_visits', ['url', 'datetime_visited'], unique=False)
+    op.create_index(op.f('ix_page_visits_datetime_visited'), 'page_visits', ['datetime_visited'], unique=False)
+    op.create_index(op.f('ix_page_visits_id'), 'page_visits', ['id'], unique=False)
+    op.create_index(op.f('ix_page_visits_url'), 'page_visits', ['url'], unique=False)
 
 
 def downgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
\ No newline at end of file
+    op.drop_table('page_visits')
\ No newline at end of file
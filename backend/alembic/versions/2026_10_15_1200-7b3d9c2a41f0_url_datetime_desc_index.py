@@ -0,0 +1,38 @@
+"""Replace url indexes with descending composite index
+
+Revision ID: 7b3d9c2a41f0
+Revises: e4caaa817d44
+Create Date: 2026-10-15 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7b3d9c2a41f0'
+down_revision = 'e4caaa817d44'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_url_datetime_desc "
+            "ON page_visits (url, datetime_visited DESC)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_url_datetime")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_page_visits_url")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_page_visits_id")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_page_visits_id ON page_visits (id)")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_page_visits_url ON page_visits (url)")
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_url_datetime "
+            "ON page_visits (url, datetime_visited)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_url_datetime_desc")
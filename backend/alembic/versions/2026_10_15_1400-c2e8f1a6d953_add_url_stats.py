@@ -0,0 +1,34 @@
+"""Add url_stats visit counters
+
+Revision ID: c2e8f1a6d953
+Revises: 7b3d9c2a41f0
+Create Date: 2026-10-15 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2e8f1a6d953'
+down_revision = '7b3d9c2a41f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('url_stats',
+    sa.Column('url', sa.Text(), nullable=False),
+    sa.Column('visit_count', sa.BigInteger(), nullable=False),
+    sa.Column('last_visited', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('url')
+    )
+    # Backfill counters from existing history
+    op.execute(
+        "INSERT INTO url_stats (url, visit_count, last_visited) "
+        "SELECT url, count(*), max(datetime_visited) FROM page_visits GROUP BY url"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('url_stats')
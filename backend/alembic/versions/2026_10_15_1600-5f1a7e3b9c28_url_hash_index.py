@@ -0,0 +1,42 @@
+"""Index page visits by url hash instead of url text
+
+Revision ID: 5f1a7e3b9c28
+Revises: c2e8f1a6d953
+Create Date: 2026-10-15 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f1a7e3b9c28'
+down_revision = 'c2e8f1a6d953'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('page_visits', sa.Column('url_hash', sa.BigInteger(), nullable=True))
+    # Same value as app.models.hash_url: first 8 bytes of md5(url) as a signed bigint
+    op.execute("UPDATE page_visits SET url_hash = ('x' || left(md5(url), 16))::bit(64)::bigint")
+    op.alter_column('page_visits', 'url_hash', nullable=False)
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_urlhash_datetime "
+            "ON page_visits (url_hash, datetime_visited DESC)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_url_datetime_desc")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_url_datetime_desc "
+            "ON page_visits (url, datetime_visited DESC)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_urlhash_datetime")
+
+    op.drop_column('page_visits', 'url_hash')
@@ -0,0 +1,135 @@
+"""
+Redis response cache for read endpoints.
+
+Caching is enabled only when REDIS_URL is set. Successful responses are
+stored as JSON; per-URL entries live in one Redis hash so a new visit can
+invalidate every cached page for that URL with a single DEL.
+"""
+import os
+from typing import Any, Optional
+from uuid import UUID
+
+import orjson
+from pydantic import BaseModel
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+# Get Redis URL from environment variable (caching disabled when unset)
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Key prefix for all cached responses
+CACHE_PREFIX = "visits"
+
+# Expiry tiers in seconds
+CACHE_TTL_SHORT = 5
+CACHE_TTL_NORMAL = 30
+CACHE_TTL_LONG = 60
+
+redis_client: Optional[aioredis.Redis] = (
+    aioredis.from_url(REDIS_URL) if REDIS_URL else None
+)
+
+
+def _encode_default(obj: Any) -> Any:
+    """orjson fallback for types it cannot serialize natively."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    # asyncpg returns its own UUID subclass, which orjson does not accept
+    if isinstance(obj, UUID):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def url_key(url: str) -> str:
+    """Hash key holding cached responses for a single URL."""
+    return f"{CACHE_PREFIX}:url:{url}"
+
+
+def all_visits_key() -> str:
+    """Hash key holding cached responses for the all-visits listing."""
+    return f"{CACHE_PREFIX}:all"
+
+
+def health_key() -> str:
+    """Key holding the cached health check response."""
+    return f"{CACHE_PREFIX}:health"
+
+
+async def get_cached(key: str, field: Optional[str] = None) -> Optional[Any]:
+    """
+    Get a cached response.
+
+    Args:
+        key: Redis key
+        field: Hash field, or None for a plain key
+
+    Returns:
+        Decoded response data, or None on a miss or when caching is disabled
+    """
+    if redis_client is None:
+        return None
+
+    try:
+        if field is None:
+            cached = await redis_client.get(key)
+        else:
+            cached = await redis_client.hget(key, field)
+    except RedisError as e:
+        print(f"Cache read failed for {key}: {str(e)}")
+        return None
+
+    return orjson.loads(cached) if cached is not None else None
+
+
+async def set_cached(
+    key: str,
+    value: Any,
+    expire: int,
+    field: Optional[str] = None
+) -> None:
+    """
+    Store a response in the cache.
+
+    Args:
+        key: Redis key
+        value: Response data (dicts, lists, Pydantic models, UUIDs, datetimes)
+        expire: Time to live in seconds
+        field: Hash field, or None for a plain key
+    """
+    if redis_client is None:
+        return
+
+    payload = orjson.dumps(value, default=_encode_default)
+
+    try:
+        if field is None:
+            await redis_client.set(key, payload, ex=expire)
+        else:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                await pipe.hset(key, field, payload).expire(key, expire).execute()
+    except RedisError as e:
+        print(f"Cache write failed for {key}: {str(e)}")
+
+
+async def invalidate_url(*urls: str) -> None:
+    """
+    Drop cached responses affected by new visits to one or more URLs.
+
+    All URL hashes and the all-visits listing are removed with a single DEL.
+
+    Args:
+        urls: The visited URLs
+    """
+    if redis_client is None or not urls:
+        return
+
+    try:
+        await redis_client.delete(*(url_key(url) for url in urls), all_visits_key())
+    except RedisError as e:
+        print(f"Cache invalidation failed for {', '.join(urls)}: {str(e)}")
+
+
+async def close_cache() -> None:
+    """Close the Redis connection pool."""
+    if redis_client is not None:
+        await redis_client.close()
@@ -1,19 +1,155 @@
 """
 CRUD operations for database interactions.
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy import and_, case, desc, insert, select, tuple_
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
+from uuid import UUID
 
-from app.models import PageVisit
-from app.schemas import PageVisitCreate
+from app.models import PageVisit, UrlStats, hash_url
+from app.schemas import PageVisitCreate, naive_utc
 
+# Columns exposed by PageVisitResponse, for queries that skip ORM hydration
+PAGE_VISIT_COLUMNS = (
+    PageVisit.id,
+    PageVisit.url,
+    PageVisit.datetime_visited,
+    PageVisit.link_count,
+    PageVisit.word_count,
+    PageVisit.image_count,
+    PageVisit.created_at,
+)
 
-def create_page_visit(db: Session, visit: PageVisitCreate) -> PageVisit:
+# Newest first; id breaks ties between visits recorded at the same instant
+NEWEST_FIRST = (desc(PageVisit.datetime_visited), desc(PageVisit.id))
+
+
+def _visits_to(url: str):
+    """
+    Filter selecting visits to a URL.
+    
+    The url_hash comparison uses the compact index; comparing url as well
+    rules out hash collisions.
+    
+    Args:
+        url: The URL to match
+    
+    Returns:
+        SQLAlchemy filter expression
+    """
+    return and_(PageVisit.url_hash == hash_url(url), PageVisit.url == url)
+
+
+def _visited_before(after: datetime, after_id: Optional[UUID]):
+    """
+    Keyset filter selecting visits that sort after the given cursor.
+    
+    Args:
+        after: datetime_visited of the last visit already seen
+        after_id: id of the last visit already seen (tie-breaker)
+    
+    Returns:
+        SQLAlchemy filter expression
+    """
+    after = naive_utc(after)
+    if after_id is None:
+        return PageVisit.datetime_visited < after
+    return tuple_(PageVisit.datetime_visited, PageVisit.id) < tuple_(after, after_id)
+
+
+def _page_of_visits_to(
+    stmt,
+    url: str,
+    limit: int,
+    offset: int,
+    after: Optional[datetime],
+    after_id: Optional[UUID]
+):
+    """
+    Restrict a select to one newest-first page of visits to a URL.
+    
+    Args:
+        stmt: Select over PageVisit
+        url: The URL to match
+        limit: Maximum number of results
+        offset: Number of results to skip
+        after: Keyset cursor; only return visits older than this
+        after_id: Cursor tie-breaker for visits sharing the same timestamp
+    
+    Returns:
+        The paginated select
+    """
+    stmt = stmt.where(_visits_to(url))
+    if after is not None:
+        stmt = stmt.where(_visited_before(after, after_id))
+    return stmt.order_by(*NEWEST_FIRST).limit(limit).offset(offset)
+
+
+def _visit_row(visit: PageVisitCreate, visit_time: datetime) -> Dict[str, Any]:
+    """
+    Column values for inserting a page visit.
+    
+    Args:
+        visit: Page visit data
+        visit_time: Timestamp used when the visit has none
+    
+    Returns:
+        Dict of column values
+    """
+    return {
+        "url": visit.url,
+        "datetime_visited": visit.datetime_visited or visit_time,
+        "link_count": visit.link_count,
+        "word_count": visit.word_count,
+        "image_count": visit.image_count
+    }
+
+
+async def _record_url_stats(db: AsyncSession, visits: Iterable[Tuple[str, datetime]]) -> None:
+    """
+    Add visits to the per-URL counters in url_stats.
+    
+    Visits are aggregated per URL first so each counter row is upserted
+    once, in URL order to keep lock order consistent across writers.
+    
+    Args:
+        db: Database session
+        visits: (url, datetime_visited) pairs
+    """
+    stats: Dict[str, Dict[str, Any]] = {}
+    for url, visit_time in visits:
+        row = stats.setdefault(url, {"url": url, "visit_count": 0, "last_visited": visit_time})
+        row["visit_count"] += 1
+        row["last_visited"] = max(row["last_visited"], visit_time)
+    
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    upsert = dialect.insert(UrlStats).values([stats[url] for url in sorted(stats)])
+    
+    await db.execute(
+        upsert.on_conflict_do_update(
+            index_elements=[UrlStats.url],
+            set_={
+                "visit_count": UrlStats.visit_count + upsert.excluded.visit_count,
+                # Visits may arrive out of order, so keep the newest timestamp
+                "last_visited": case(
+                    (upsert.excluded.last_visited > UrlStats.last_visited, upsert.excluded.last_visited),
+                    else_=UrlStats.last_visited
+                )
+            }
+        )
+    )
+
+
+async def create_page_visit(db: AsyncSession, visit: PageVisitCreate) -> PageVisit:
     """
     Create a new page visit record in the database.
     
+    The stored row comes back via INSERT ... RETURNING, so no follow-up
+    SELECT is needed. The URL's counter in url_stats is updated in the
+    same transaction.
+    
     Args:
         db: Database session
         visit: Page visit data
@@ -22,28 +158,49 @@ def create_page_visit(db: Session, visit: PageVisitCreate) -> PageVisit:
         Created PageVisit object
     """
     # Use provided datetime or current time
-    visit_time = visit.datetime_visited or datetime.utcnow()
-    
-    db_visit = PageVisit(
-        url=visit.url,
-        datetime_visited=visit_time,
-        link_count=visit.link_count,
-        word_count=visit.word_count,
-        image_count=visit.image_count
-    )
+    row = _visit_row(visit, datetime.utcnow())
     
-    db.add(db_visit)
-    db.commit()
-    db.refresh(db_visit)
+    db_visit = await db.scalar(insert(PageVisit).values(**row).returning(PageVisit))
+    await _record_url_stats(db, [(row["url"], row["datetime_visited"])])
+    await db.commit()
     
     return db_visit
 
 
-def get_visits_by_url(
-    db: Session, 
+async def create_page_visits(db: AsyncSession, visits: List[PageVisitCreate]) -> List[PageVisit]:
+    """
+    Create several page visit records with a single multi-row INSERT.
+    
+    Args:
+        db: Database session
+        visits: Page visit data
+    
+    Returns:
+        Created PageVisit objects, in the same order as the input
+    """
+    # Visits without a timestamp share the time the batch was received
+    visit_time = datetime.utcnow()
+    
+    rows = [_visit_row(visit, visit_time) for visit in visits]
+    
+    result = await db.scalars(
+        insert(PageVisit).returning(PageVisit, sort_by_parameter_order=True),
+        rows
+    )
+    db_visits = list(result.all())
+    await _record_url_stats(db, [(row["url"], row["datetime_visited"]) for row in rows])
+    await db.commit()
+    
+    return db_visits
+
+
+async def get_visits_by_url(
+    db: AsyncSession, 
     url: str, 
     limit: int = 50, 
-    offset: int = 0
+    offset: int = 0,
+    after: Optional[datetime] = None,
+    after_id: Optional[UUID] = None
 ) -> List[PageVisit]:
     """
     Get all visits for a specific URL, ordered by most recent first.
@@ -53,21 +210,60 @@ def get_visits_by_url(
         url: The URL to query
         limit: Maximum number of results
         offset: Number of results to skip
+        after: Keyset cursor; only return visits older than this
+        after_id: Cursor tie-breaker for visits sharing the same timestamp
     
     Returns:
         List of PageVisit objects
     """
-    return (
-        db.query(PageVisit)
-        .filter(PageVisit.url == url)
-        .order_by(desc(PageVisit.datetime_visited))
-        .limit(limit)
-        .offset(offset)
-        .all()
+    result = await db.execute(
+        _page_of_visits_to(select(PageVisit), url, limit, offset, after, after_id)
     )
+    return list(result.scalars().all())
 
 
-def get_latest_visit_by_url(db: Session, url: str) -> Optional[PageVisit]:
+async def get_visits_with_total_by_url(
+    db: AsyncSession,
+    url: str,
+    limit: int = 50,
+    offset: int = 0,
+    after: Optional[datetime] = None,
+    after_id: Optional[UUID] = None
+) -> Tuple[List[PageVisit], int]:
+    """
+    Get a page of visits for a URL together with the total visit count.
+    
+    Args:
+        db: Database session
+        url: The URL to query
+        limit: Maximum number of results
+        offset: Number of results to skip
+        after: Keyset cursor; only return visits older than this
+        after_id: Cursor tie-breaker for visits sharing the same timestamp
+    
+    Returns:
+        Tuple of (list of PageVisit objects, total count)
+    """
+    # The url_stats counter rides along on every row, so one round trip
+    # returns the page and the total
+    total = (
+        select(UrlStats.visit_count)
+        .where(UrlStats.url == url)
+        .scalar_subquery()
+        .label("total")
+    )
+    result = await db.execute(
+        _page_of_visits_to(select(PageVisit, total), url, limit, offset, after, after_id)
+    )
+    rows = result.all()
+    
+    if not rows:
+        # Past the last page there are no rows to carry the total
+        return [], await get_visit_count_by_url(db, url)
+    return [row.PageVisit for row in rows], rows[0].total or 0
+
+
+async def get_latest_visit_by_url(db: AsyncSession, url: str) -> Optional[PageVisit]:
     """
     Get the most recent visit for a specific URL.
     
@@ -78,18 +274,21 @@ def get_latest_visit_by_url(db: Session, url: str) -> Optional[PageVisit]:
     Returns:
         PageVisit object or None if no visits found
     """
-    return (
-        db.query(PageVisit)
-        .filter(PageVisit.url == url)
-        .order_by(desc(PageVisit.datetime_visited))
-        .first()
+    result = await db.execute(
+        select(PageVisit)
+        .where(_visits_to(url))
+        .order_by(*NEWEST_FIRST)
+        .limit(1)
     )
+    return result.scalars().first()
 
 
-def get_visit_count_by_url(db: Session, url: str) -> int:
+async def get_visit_count_by_url(db: AsyncSession, url: str) -> int:
     """
     Get the total number of visits for a specific URL.
     
+    Reads the maintained counter in url_stats instead of counting rows.
+    
     Args:
         db: Database session
         url: The URL to query
@@ -97,25 +296,43 @@ def get_visit_count_by_url(db: Session, url: str) -> int:
     Returns:
         Count of visits
     """
-    return db.query(PageVisit).filter(PageVisit.url == url).count()
+    count = await db.scalar(
+        select(UrlStats.visit_count).where(UrlStats.url == url)
+    )
+    return count or 0
 
 
-def get_all_visits(db: Session, limit: int = 100, offset: int = 0) -> List[PageVisit]:
+async def get_all_visits(
+    db: AsyncSession,
+    limit: int = 100,
+    offset: int = 0,
+    after: Optional[datetime] = None,
+    after_id: Optional[UUID] = None
+) -> List[Dict[str, Any]]:
     """
     Get all visits across all URLs.
     
+    Selects plain columns rather than PageVisit entities, so rows come back
+    ready to serialize without ORM object construction.
+    
     Args:
         db: Database session
         limit: Maximum number of results
         offset: Number of results to skip
+        after: Keyset cursor; only return visits older than this
+        after_id: Cursor tie-breaker for visits sharing the same timestamp
     
     Returns:
-        List of PageVisit objects
+        List of visit dicts with the PageVisitResponse fields
     """
-    return (
-        db.query(PageVisit)
-        .order_by(desc(PageVisit.datetime_visited))
+    stmt = select(*PAGE_VISIT_COLUMNS)
+    if after is not None:
+        stmt = stmt.where(_visited_before(after, after_id))
+    
+    result = await db.execute(
+        stmt
+        .order_by(*NEWEST_FIRST)
         .limit(limit)
         .offset(offset)
-        .all()
-    )
\ No newline at end of file
+    )
+    return [dict(row) for row in result.mappings()]
\ No newline at end of file
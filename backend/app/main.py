@@ -1,12 +1,17 @@
 """
 Main FastAPI application entry point.
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 
-from app.database import engine, get_db, Base
+from app.database import engine, get_db
+from app import cache
 from app.routers import visits
 from app.schemas import HealthResponse
 from app.response import success_response, error_response
@@ -16,8 +21,21 @@ start_time = datetime.utcnow()
 APP_VERSION = "1.0.0"
 APP_TITLE = "Chrome History Sidepanel API"
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Responses smaller than this (e.g. /health) are sent uncompressed
+GZIP_MINIMUM_SIZE = 1024
+GZIP_COMPRESS_LEVEL = 5
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run on application startup and shutdown."""
+    print(f"🚀 {APP_TITLE} is starting...")
+    print(f"✅ API is ready to accept requests")
+    yield
+    print(f"👋 {APP_TITLE} is shutting down...")
+    await engine.dispose()
+    await cache.close_cache()
+
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -25,7 +43,9 @@ app = FastAPI(
     description="Backend API for Chrome extension that tracks page visit history and analytics",
     version=APP_VERSION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS to allow Chrome extension to communicate
@@ -38,6 +58,13 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+# Compress visit listings, which are large and highly repetitive JSON
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=GZIP_MINIMUM_SIZE,
+    compresslevel=GZIP_COMPRESS_LEVEL
+)
+
 # Include routers
 app.include_router(visits.router)
 
@@ -56,14 +83,17 @@ async def root():
 
 
 @app.get("/health", tags=["health"])
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_db)):
     """
     Health check endpoint to verify API and database connectivity.
     """
+    cached = await cache.get_cached(cache.health_key())
+    if cached is not None:
+        return cached
+    
     try:
         # Test database connection (SQLAlchemy 2.0 compatible)
-        from sqlalchemy import text
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         db_status = "connected"
         status = "healthy"
         status_code = 200
@@ -84,27 +114,15 @@ async def health_check(db: Session = Depends(get_db)):
     }
     
     if status == "healthy":
-        return success_response(
+        response = success_response(
             data=health_data,
             message="Service healthy"
         )
+        await cache.set_cached(cache.health_key(), response, cache.CACHE_TTL_SHORT)
+        return response
     else:
         return error_response(
             message="Service unhealthy",
             status_code=status_code,
             data=health_data
         )
-
-
-@app.on_event("startup")
-async def startup_event():
-    """Run on application startup."""
-    print(f"🚀 {APP_TITLE} is starting...")
-    print(f"📊 Database tables created/verified")
-    print(f"✅ API is ready to accept requests")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Run on application shutdown."""
-    print(f"👋 {APP_TITLE} is shutting down...")
\ No newline at end of file
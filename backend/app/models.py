@@ -1,25 +1,63 @@
 """
 SQLAlchemy database models.
 """
-from sqlalchemy import Column, String, Integer, DateTime, Text, Index
+from sqlalchemy import BigInteger, Column, String, Integer, DateTime, Text, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
+import hashlib
+import os
+import time
 import uuid
 
 from app.database import Base
 
 
+def uuid7() -> uuid.UUID:
+    """
+    Generate a time-ordered UUIDv7 (RFC 9562).
+
+    The leading 48 bits are the Unix timestamp in milliseconds, so new keys
+    land at the right edge of the primary key index instead of at random
+    leaf pages. The remaining bits are random: keys generated within the
+    same millisecond are not in creation order, only in a stable total
+    order, which is all the keyset pagination tie-breaker needs.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms << 80) | int.from_bytes(os.urandom(10), "big")
+    # Set version (0111) and variant (10) bits
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return uuid.UUID(int=value)
+
+
+def hash_url(url: str) -> int:
+    """
+    Hash a URL to a signed 64-bit integer for compact index keys.
+
+    Uses the first 8 bytes of its MD5 digest, which PostgreSQL can compute
+    identically as ('x' || left(md5(url), 16))::bit(64)::bigint.
+    """
+    digest = hashlib.md5(url.encode(), usedforsecurity=False).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+def _url_hash_default(context) -> int:
+    """Column default deriving url_hash from the url being inserted."""
+    return hash_url(context.get_current_parameters()["url"])
+
+
 class PageVisit(Base):
     """
     Model for storing page visit history and metrics.
     """
     __tablename__ = "page_visits"
 
-    # Primary key
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    # Primary key (time-ordered)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     
-    # Page information
-    url = Column(Text, nullable=False, index=True)
+    # Page information (looked up via url_hash, then compared exactly)
+    url = Column(Text, nullable=False)
+    url_hash = Column(BigInteger, nullable=False, default=_url_hash_default)
     
     # Visit timestamp
     datetime_visited = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
@@ -32,10 +70,24 @@ class PageVisit(Base):
     # Metadata
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
-    # Create composite index for efficient querying
+    # Composite index matching the per-URL "most recent first" queries
     __table_args__ = (
-        Index('idx_url_datetime', 'url', 'datetime_visited'),
+        Index('idx_urlhash_datetime', 'url_hash', text('datetime_visited DESC')),
     )
 
     def __repr__(self):
-        return f"<PageVisit(url={self.url}, visited={self.datetime_visited})>"
\ No newline at end of file
+        return f"<PageVisit(url={self.url}, visited={self.datetime_visited})>"
+
+
+class UrlStats(Base):
+    """
+    Per-URL visit counters, maintained alongside page_visits inserts.
+    """
+    __tablename__ = "url_stats"
+
+    url = Column(Text, primary_key=True)
+    visit_count = Column(BigInteger, nullable=False, default=0)
+    last_visited = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<UrlStats(url={self.url}, visits={self.visit_count})>"
@@ -2,7 +2,7 @@
 Standardized API response helpers for consistent error handling.
 """
 from typing import Any, Optional, Dict
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 
 def success_response(
@@ -33,7 +33,7 @@ def error_response(
     status_code: int = 400,
     errors: Optional[list] = None,
     data: Optional[Dict] = None
-) -> JSONResponse:
+) -> ORJSONResponse:
     """
     Standardized error response format.
     
@@ -44,7 +44,7 @@ def error_response(
         data: Additional error context
     
     Returns:
-        JSONResponse with error details
+        ORJSONResponse with error details
     """
     response_data = {
         "success": False,
@@ -57,7 +57,7 @@ def error_response(
     if data:
         response_data["data"] = data
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status_code,
         content=response_data
     )
\ No newline at end of file
@@ -2,15 +2,18 @@
 API routes for page visits.
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List
-from urllib.parse import unquote
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from uuid import UUID
 
 from app.database import get_db
-from app.schemas import PageVisitCreate, PageVisitResponse, PageVisitList
+from app.models import PageVisit
+from app.schemas import PageVisitCreate, PageVisitBatchCreate, PageVisitResponse, PageVisitList, visit_list_adapter
 from app.response import success_response, error_response
-from app import crud
+from app.urls import url_param
+from app import cache, crud
 
 router = APIRouter(
     prefix="/api/visits",
@@ -18,10 +21,23 @@ router = APIRouter(
 )
 
 
+def _dump_visits(visits: List[PageVisit]) -> List[Dict[str, Any]]:
+    """Validate PageVisit rows and dump them to JSON-ready dicts."""
+    return visit_list_adapter.dump_python(
+        visit_list_adapter.validate_python(visits, from_attributes=True),
+        mode="json"
+    )
+
+
+def _next_cursor(last_datetime: datetime, last_id: UUID) -> Dict[str, Any]:
+    """Keyset cursor pointing just past the given visit."""
+    return {"after": last_datetime, "after_id": last_id}
+
+
 @router.post("/", status_code=201)
-def create_visit(
+async def create_visit(
     visit: PageVisitCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new page visit record.
@@ -34,9 +50,10 @@ def create_visit(
     - image_count: Number of images on the page
     """
     try:
-        db_visit = crud.create_page_visit(db=db, visit=visit)
+        db_visit = await crud.create_page_visit(db=db, visit=visit)
+        await cache.invalidate_url(db_visit.url)
         return success_response(
-            data=PageVisitResponse.model_validate(db_visit).model_dump(),
+            data=PageVisitResponse.model_validate(db_visit),
             message="Visit created successfully",
             status_code=201
         )
@@ -55,12 +72,54 @@ def create_visit(
         )
 
 
+@router.post("/batch", status_code=201)
+async def create_visits_batch(
+    batch: PageVisitBatchCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create several page visit records in one request.
+    
+    **Request Body:**
+    - visits: List of page visits (1-100), each with the same fields as POST /api/visits
+    """
+    try:
+        db_visits = await crud.create_page_visits(db=db, visits=batch.visits)
+        await cache.invalidate_url(*{v.url for v in db_visits})
+        
+        visits_data = _dump_visits(db_visits)
+        
+        return success_response(
+            data={
+                "visits": visits_data,
+                "total": len(visits_data)
+            },
+            message="Visits created successfully",
+            status_code=201
+        )
+    except SQLAlchemyError as e:
+        print(f"Database error creating visits: {str(e)}")
+        return error_response(
+            message="Failed to create visits",
+            status_code=500,
+            errors=[str(e)]
+        )
+    except Exception as e:
+        print(f"Unexpected error creating visits: {str(e)}")
+        return error_response(
+            message="An unexpected error occurred",
+            status_code=500
+        )
+
+
 @router.get("/url/{url:path}")
-def get_visits_for_url(
-    url: str,
+async def get_visits_for_url(
+    decoded_url: str = Depends(url_param),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db)
+    after: Optional[datetime] = Query(None),
+    after_id: Optional[UUID] = Query(None),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get all visits for a specific URL.
@@ -71,22 +130,34 @@ def get_visits_for_url(
     **Query Parameters:**
     - limit: Maximum number of results (default: 50, max: 100)
     - offset: Number of results to skip (default: 0)
+    - after, after_id: Keyset cursor from a previous page's next_cursor
     """
     try:
-        # Decode URL if it's encoded
-        decoded_url = unquote(url)
+        cache_key = cache.url_key(decoded_url)
+        cache_field = f"list:{limit}:{offset}:{after}:{after_id}"
+        cached = await cache.get_cached(cache_key, cache_field)
+        if cached is not None:
+            return cached
         
-        visits = crud.get_visits_by_url(db=db, url=decoded_url, limit=limit, offset=offset)
-        total = crud.get_visit_count_by_url(db=db, url=decoded_url)
+        visits, total = await crud.get_visits_with_total_by_url(
+            db=db, url=decoded_url, limit=limit, offset=offset, after=after, after_id=after_id
+        )
         
-        visits_data = [PageVisitResponse.model_validate(v).model_dump() for v in visits]
+        visits_data = _dump_visits(visits)
+        next_cursor = (
+            _next_cursor(visits[-1].datetime_visited, visits[-1].id)
+            if len(visits) == limit else None
+        )
         
-        return success_response(
+        response = success_response(
             data={
                 "visits": visits_data,
-                "total": total
+                "total": total,
+                "next_cursor": next_cursor
             }
         )
+        await cache.set_cached(cache_key, response, cache.CACHE_TTL_LONG, cache_field)
+        return response
     except SQLAlchemyError as e:
         print(f"Database error fetching visits: {str(e)}")
         return error_response(
@@ -102,9 +173,9 @@ def get_visits_for_url(
 
 
 @router.get("/url/{url:path}/latest")
-def get_latest_visit_for_url(
-    url: str,
-    db: Session = Depends(get_db)
+async def get_latest_visit_for_url(
+    decoded_url: str = Depends(url_param),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get the most recent visit for a specific URL.
@@ -113,10 +184,12 @@ def get_latest_visit_for_url(
     - url: The page URL (URL-encoded)
     """
     try:
-        # Decode URL if it's encoded
-        decoded_url = unquote(url)
+        cache_key = cache.url_key(decoded_url)
+        cached = await cache.get_cached(cache_key, "latest")
+        if cached is not None:
+            return cached
         
-        visit = crud.get_latest_visit_by_url(db=db, url=decoded_url)
+        visit = await crud.get_latest_visit_by_url(db=db, url=decoded_url)
         
         if not visit:
             return error_response(
@@ -124,9 +197,11 @@ def get_latest_visit_for_url(
                 status_code=404
             )
         
-        return success_response(
-            data=PageVisitResponse.model_validate(visit).model_dump()
+        response = success_response(
+            data=PageVisitResponse.model_validate(visit)
         )
+        await cache.set_cached(cache_key, response, cache.CACHE_TTL_LONG, "latest")
+        return response
     except SQLAlchemyError as e:
         print(f"Database error: {str(e)}")
         return error_response(
@@ -142,10 +217,12 @@ def get_latest_visit_for_url(
 
 
 @router.get("/")
-def get_all_visits(
+async def get_all_visits(
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db)
+    after: Optional[datetime] = Query(None),
+    after_id: Optional[UUID] = Query(None),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get all visits across all URLs.
@@ -153,19 +230,33 @@ def get_all_visits(
     **Query Parameters:**
     - limit: Maximum number of results (default: 100, max: 500)
     - offset: Number of results to skip (default: 0)
+    - after, after_id: Keyset cursor from a previous page's next_cursor
     """
     try:
-        visits = crud.get_all_visits(db=db, limit=limit, offset=offset)
-        total = len(visits)
+        cache_key = cache.all_visits_key()
+        cache_field = f"list:{limit}:{offset}:{after}:{after_id}"
+        cached = await cache.get_cached(cache_key, cache_field)
+        if cached is not None:
+            return cached
         
-        visits_data = [PageVisitResponse.model_validate(v).model_dump() for v in visits]
+        visits = await crud.get_all_visits(
+            db=db, limit=limit, offset=offset, after=after, after_id=after_id
+        )
+        total = len(visits)
+        next_cursor = (
+            _next_cursor(visits[-1]["datetime_visited"], visits[-1]["id"])
+            if len(visits) == limit else None
+        )
         
-        return success_response(
+        response = success_response(
             data={
-                "visits": visits_data,
-                "total": total
+                "visits": visits,
+                "total": total,
+                "next_cursor": next_cursor
             }
         )
+        await cache.set_cached(cache_key, response, cache.CACHE_TTL_NORMAL, cache_field)
+        return response
     except SQLAlchemyError as e:
         print(f"Database error: {str(e)}")
         return error_response(
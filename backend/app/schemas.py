@@ -1,11 +1,26 @@
 """
 Pydantic schemas for request/response validation.
 """
-from pydantic import BaseModel, Field, HttpUrl
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl, TypeAdapter, field_validator
+from datetime import datetime, timezone
 from typing import Optional
 from uuid import UUID
 
+from app.urls import normalize_url
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Convert a timezone-aware datetime to naive UTC.
+
+    Timestamps are stored in TIMESTAMP WITHOUT TIME ZONE columns, which
+    asyncpg refuses to bind aware datetimes to. Naive values are assumed
+    to be UTC already and are returned unchanged.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
 
 class PageVisitCreate(BaseModel):
     """Schema for creating a new page visit."""
@@ -18,6 +33,18 @@ class PageVisitCreate(BaseModel):
     word_count: int = Field(..., ge=0, description="Number of words on the page")
     image_count: int = Field(..., ge=0, description="Number of images on the page")
 
+    @field_validator("url")
+    @classmethod
+    def normalize(cls, url: str) -> str:
+        """Store URLs in the same form they are looked up by."""
+        return normalize_url(url)
+
+    @field_validator("datetime_visited")
+    @classmethod
+    def to_naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        """Store timestamps such as "2025-10-12T10:30:00Z" as naive UTC."""
+        return naive_utc(value)
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -30,8 +57,20 @@ class PageVisitCreate(BaseModel):
         }
 
 
+class PageVisitBatchCreate(BaseModel):
+    """Schema for creating several page visits in one request."""
+    visits: list[PageVisitCreate] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Page visits to create (up to 100 per request)"
+    )
+
+
 class PageVisitResponse(BaseModel):
     """Schema for page visit response."""
+    model_config = ConfigDict(from_attributes=True)
+
     id: UUID
     url: str
     datetime_visited: datetime
@@ -40,14 +79,22 @@ class PageVisitResponse(BaseModel):
     image_count: int
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+
+# Validates and dumps whole lists of visits in a single pydantic-core call
+visit_list_adapter = TypeAdapter(list[PageVisitResponse])
+
+
+class VisitCursor(BaseModel):
+    """Keyset cursor for fetching the next page of visits."""
+    after: datetime
+    after_id: UUID
 
 
 class PageVisitList(BaseModel):
     """Schema for list of page visits."""
     visits: list[PageVisitResponse]
     total: int
+    next_cursor: Optional[VisitCursor] = None
 
 
 class HealthResponse(BaseModel):
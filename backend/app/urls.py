@@ -0,0 +1,58 @@
+"""
+URL normalization shared by request validation and URL path parameters.
+"""
+from functools import lru_cache
+from urllib.parse import unquote, urlsplit, urlunsplit
+
+# Distinct URLs remembered by each cache
+URL_CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def normalize_url(url: str) -> str:
+    """
+    Lowercase the scheme and host of a URL, which are case-insensitive.
+
+    Path, query and fragment are left untouched, so the same page always
+    maps to the same stored url (and url_hash).
+
+    Args:
+        url: URL as received
+
+    Returns:
+        Normalized URL, or the URL unchanged if it cannot be parsed
+    """
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        # e.g. an unterminated IPv6 host such as "http://[abc"
+        return url
+    userinfo, at, host = parts.netloc.rpartition("@")
+    scheme, netloc = parts.scheme.lower(), userinfo + at + host.lower()
+
+    if (scheme, netloc) == (parts.scheme, parts.netloc):
+        return url
+    return urlunsplit((scheme, netloc, parts.path, parts.query, parts.fragment))
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def decode_url(url: str) -> str:
+    """
+    Decode a percent-encoded URL path parameter and normalize it.
+
+    Args:
+        url: URL path parameter
+
+    Returns:
+        Decoded, normalized URL
+    """
+    return normalize_url(unquote(url))
+
+
+async def url_param(url: str) -> str:
+    """
+    Dependency that provides the decoded {url} path parameter.
+
+    Declared async so FastAPI calls it inline rather than in a threadpool.
+    """
+    return decode_url(url)
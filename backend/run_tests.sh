@@ -41,6 +41,11 @@ case "$TEST_TYPE" in
         pytest tests/unit -v --tb=short
         ;;
     
+    "parallel")
+        echo -e "${YELLOW}Running all tests across CPU cores...${NC}"
+        pytest tests/ -n auto
+        ;;
+    
     "verbose")
         echo -e "${YELLOW}Running all tests with verbose output...${NC}"
         pytest -vv --tb=long
@@ -62,6 +67,7 @@ case "$TEST_TYPE" in
         echo "  integration  - Run integration tests only"
         echo "  coverage     - Run all tests with coverage report"
         echo "  fast         - Run fast tests only"
+        echo "  parallel     - Run all tests across CPU cores (pytest-xdist)"
         echo "  verbose      - Run all tests with verbose output"
         exit 1
         ;;
@@ -1,77 +1,162 @@
 """
 Pytest configuration and shared fixtures.
 """
+import asyncio
+import os
+from types import MappingProxyType
+import httpx
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import StaticPool
 
+# Make accidental lazy loads raise in tests (read by app.database at import)
+os.environ.setdefault("ENVIRONMENT", "test")
+
 from app.main import app
+from app import crud
 from app.database import Base, get_db
 from app.models import PageVisit
+from app.schemas import PageVisitCreate
 
-# Create in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# Create in-memory SQLite database for testing. It lives in this process
+# only, so each pytest-xdist worker (pytest -n auto) gets its own database.
+SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
-engine = create_engine(
+engine = create_async_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
 
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+    # Session commits release a SAVEPOINT inside the per-test transaction
+    join_transaction_mode="create_savepoint"
+)
 
 
-@pytest.fixture(scope="function")
-def db_session():
+@event.listens_for(engine.sync_engine, "connect")
+def _disable_driver_transactions(dbapi_connection, connection_record):
+    """
+    Stop the SQLite driver from managing transactions itself,
+    so SAVEPOINTs nest inside the per-test transaction.
+    """
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine.sync_engine, "begin")
+def _emit_begin(conn):
+    """Emit BEGIN explicitly now that the driver no longer does."""
+    conn.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture(scope="session")
+def event_loop():
     """
-    Create a fresh database session for each test.
+    Share one event loop across the session so the schema is built once.
+    """
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+async def db_schema():
     """
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+    Create all tables once for the whole test session.
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
     
-    # Create session
-    session = TestingSessionLocal()
+    yield
     
-    try:
-        yield session
-    finally:
-        session.close()
-        # Drop all tables after test
-        Base.metadata.drop_all(bind=engine)
+    # Close the shared in-memory connection so its worker thread exits
+    await engine.dispose()
 
 
 @pytest.fixture(scope="function")
-def client(db_session):
+async def db_session(db_schema):
     """
-    Create a test client with dependency override.
+    Provide a database session whose changes are rolled back after each test.
     """
-    def override_get_db():
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = TestingSessionLocal(bind=connection)
+        
         try:
-            yield db_session
+            yield session
         finally:
-            pass
+            await session.close()
+            await transaction.rollback()
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    """
+    Create one TestClient (and run the app lifespan once) for the whole session.
+    """
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="function")
+def client(app_client, db_session):
+    """
+    Provide the shared test client with get_db overridden to this test's session.
+    """
+    async def override_get_db():
+        yield db_session
     
     app.dependency_overrides[get_db] = override_get_db
     
-    with TestClient(app) as test_client:
+    yield app_client
+    
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="function")
+async def async_client(db_session):
+    """
+    Create an httpx AsyncClient that calls the app on the test's event loop.
+    """
+    async def override_get_db():
+        yield db_session
+    
+    app.dependency_overrides[get_db] = override_get_db
+    
+    transport = httpx.ASGITransport(app=app)
+    # Follow redirects like TestClient does (e.g. /api/visits -> /api/visits/)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test", follow_redirects=True
+    ) as test_client:
         yield test_client
     
     app.dependency_overrides.clear()
 
 
-@pytest.fixture
+# Read-only, so one instance can be shared by every test
+SAMPLE_VISIT = MappingProxyType({
+    "url": "https://www.uhcprovider.com/en/health-plans.html",
+    "link_count": 45,
+    "word_count": 1200,
+    "image_count": 8
+})
+
+
+@pytest.fixture(scope="session")
 def sample_visit_data():
     """
-    Sample visit data for testing.
+    Sample visit data for testing (read-only).
+    
+    Merge overrides into a new dict (``{**sample_visit_data, ...}``), and pass
+    ``dict(sample_visit_data)`` where a JSON body is needed.
     """
-    return {
-        "url": "https://www.uhcprovider.com/en/health-plans.html",
-        "link_count": 45,
-        "word_count": 1200,
-        "image_count": 8
-    }
+    return SAMPLE_VISIT
 
 
 @pytest.fixture
@@ -92,4 +177,23 @@ def sample_visits_batch():
             "word_count": 1450,
             "image_count": 10
         }
-    ]
\ No newline at end of file
+    ]
+
+
+@pytest.fixture
+def seed_visits(db_session, sample_visit_data):
+    """
+    Insert visits with one bulk insert, bypassing the HTTP layer.
+    
+    Call as ``await seed_visits(count, **fields)``, where fields override
+    sample_visit_data (e.g. url), or pass ``rows`` (a list of per-visit
+    overrides) to insert differing visits.
+    """
+    async def seed(count=1, rows=None, **fields):
+        rows = rows if rows is not None else [{}] * count
+        # Validate the shared payload once; only rows with overrides need their own
+        base = PageVisitCreate(**{**sample_visit_data, **fields})
+        visits = [PageVisitCreate(**{**sample_visit_data, **fields, **row}) if row else base for row in rows]
+        return await crud.create_page_visits(db_session, visits)
+    
+    return seed
@@ -34,6 +34,12 @@ class TestHealthEndpoints:
         assert isinstance(data["data"]["uptime_seconds"], (int, float))
         assert data["data"]["database"] == "connected"
     
+    def test_health_check_not_compressed(self, client):
+        """Test the small health response skips gzip."""
+        response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+        
+        assert "content-encoding" not in response.headers
+    
     def test_health_check_response_structure(self, client):
         """Test health check response has correct structure."""
         response = client.get("/health")
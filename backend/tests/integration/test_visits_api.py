@@ -1,8 +1,16 @@
 """
 Integration tests for visits API endpoints.
 """
+import orjson
 import pytest
-from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+from app import cache, crud
+
+# Percent-encoded {url} path parameters
+ENCODED_UHC_URL = "https%3A%2F%2Fwww.uhcprovider.com%2Fen%2Fhealth-plans.html"
+ENCODED_EXAMPLE_URL = "https%3A%2F%2Fexample.com"
+ENCODED_MISSING_URL = "https%3A%2F%2Fnonexistent.com"
 
 
 class TestCreateVisit:
@@ -10,7 +18,7 @@ class TestCreateVisit:
     
     def test_create_visit_success(self, client, sample_visit_data):
         """Test successful visit creation."""
-        response = client.post("/api/visits", json=sample_visit_data)
+        response = client.post("/api/visits", json=dict(sample_visit_data))
         
         assert response.status_code == 201
         data = response.json()
@@ -24,77 +32,74 @@ class TestCreateVisit:
         assert "created_at" in data["data"]
         assert "datetime_visited" in data["data"]
     
-    def test_create_visit_with_timestamp(self, client):
-        """Test creating visit with explicit timestamp."""
-        visit_time = "2024-01-15T10:30:00"
-        visit_data = {
-            "url": "https://example.com",
-            "datetime_visited": visit_time,
-            "link_count": 10,
-            "word_count": 500,
-            "image_count": 5
-        }
-        
-        response = client.post("/api/visits", json=visit_data)
+    def test_create_visit_utc_timestamp(self, client, sample_visit_data):
+        """Test a "Z"-suffixed timestamp, as sent by the extension, is accepted."""
+        response = client.post("/api/visits", json={**sample_visit_data, "datetime_visited": "2025-10-12T10:30:00Z"})
         
         assert response.status_code == 201
-        data = response.json()
-        assert data["success"] is True
-        # Timestamp should be preserved
-        assert visit_time in data["data"]["datetime_visited"]
+        assert response.json()["data"]["datetime_visited"] == "2025-10-12T10:30:00"
     
-    def test_create_visit_invalid_url(self, client):
-        """Test creating visit with invalid URL."""
-        invalid_data = {
-            "url": "not-a-valid-url",
-            "link_count": 10,
-            "word_count": 500,
-            "image_count": 5
-        }
-        
+    @pytest.mark.parametrize("invalid_data", [
+        pytest.param(
+            {"url": "not-a-valid-url", "link_count": 10, "word_count": 500, "image_count": 5},
+            id="invalid_url"
+        ),
+        pytest.param(
+            {"url": "https://example.com"},  # Missing link_count, word_count, image_count
+            id="missing_required_fields"
+        ),
+        pytest.param(
+            {"url": "https://example.com", "link_count": -5, "word_count": 500, "image_count": 5},
+            id="negative_counts"
+        ),
+    ])
+    def test_create_visit_validation_error(self, client, invalid_data):
+        """Test invalid visit payloads are rejected."""
         response = client.post("/api/visits", json=invalid_data)
         
-        assert response.status_code == 422  # Validation error
+        assert response.status_code == 422
+
+
+class TestCreateVisitsBatch:
+    """Test POST /api/visits/batch endpoint."""
     
-    def test_create_visit_missing_required_fields(self, client):
-        """Test creating visit without required fields."""
-        invalid_data = {
-            "url": "https://example.com"
-            # Missing link_count, word_count, image_count
-        }
+    def test_create_batch_success(self, client, sample_visits_batch):
+        """Test creating several visits in one request."""
+        response = client.post("/api/visits/batch", json={"visits": sample_visits_batch})
         
-        response = client.post("/api/visits", json=invalid_data)
+        assert response.status_code == 201
+        data = response.json()
+        assert data["success"] is True
+        assert data["data"]["total"] == 2
+        assert [v["url"] for v in data["data"]["visits"]] == [v["url"] for v in sample_visits_batch]
         
-        assert response.status_code == 422
+        data = client.get("/api/visits").json()
+        assert data["data"]["total"] == 2
     
-    def test_create_visit_negative_counts(self, client):
-        """Test creating visit with negative counts."""
-        invalid_data = {
-            "url": "https://example.com",
-            "link_count": -5,
-            "word_count": 500,
-            "image_count": 5
-        }
+    def test_create_batch_mixed_timestamps(self, client, sample_visit_data):
+        """Test a batch mixing "Z" and missing timestamps for one URL."""
+        visits = [{**sample_visit_data, "datetime_visited": "2025-10-12T10:30:00Z"}, dict(sample_visit_data)]
         
-        response = client.post("/api/visits", json=invalid_data)
+        response = client.post("/api/visits/batch", json={"visits": visits})
+        
+        assert response.status_code == 201
+        data = client.get(f"/api/visits/url/{ENCODED_UHC_URL}").json()
+        assert data["data"]["total"] == 2
+    
+    def test_create_batch_empty(self, client):
+        """Test an empty batch is rejected."""
+        response = client.post("/api/visits/batch", json={"visits": []})
         
         assert response.status_code == 422
     
-    def test_create_visit_zero_counts(self, client):
-        """Test creating visit with zero counts (should be valid)."""
-        visit_data = {
-            "url": "https://example.com",
-            "link_count": 0,
-            "word_count": 0,
-            "image_count": 0
-        }
+    def test_create_batch_invalid_visit(self, client, sample_visit_data):
+        """Test one invalid visit rejects the whole batch."""
+        invalid_visit = {**sample_visit_data, "link_count": -1}
         
-        response = client.post("/api/visits", json=visit_data)
+        response = client.post("/api/visits/batch", json={"visits": [dict(sample_visit_data), invalid_visit]})
         
-        assert response.status_code == 201
-        data = response.json()
-        assert data["success"] is True
-        assert data["data"]["link_count"] == 0
+        assert response.status_code == 422
+        assert client.get("/api/visits").json()["data"]["total"] == 0
 
 
 class TestGetVisitHistory:
@@ -103,12 +108,11 @@ class TestGetVisitHistory:
     def test_get_history_success(self, client, sample_visit_data):
         """Test getting visit history for a URL."""
         # Create two visits
-        client.post("/api/visits", json=sample_visit_data)
-        client.post("/api/visits", json=sample_visit_data)
+        client.post("/api/visits", json=dict(sample_visit_data))
+        client.post("/api/visits", json=dict(sample_visit_data))
         
         # Get history
-        encoded_url = "https%3A%2F%2Fwww.uhcprovider.com%2Fen%2Fhealth-plans.html"
-        response = client.get(f"/api/visits/url/{encoded_url}")
+        response = client.get(f"/api/visits/url/{ENCODED_UHC_URL}")
         
         assert response.status_code == 200
         data = response.json()
@@ -116,18 +120,15 @@ class TestGetVisitHistory:
         assert data["data"]["total"] == 2
         assert len(data["data"]["visits"]) == 2
     
-    def test_get_history_pagination(self, client, sample_visit_data):
+    async def test_get_history_pagination(self, async_client, seed_visits):
         """Test pagination of visit history."""
-        # Create 15 visits
-        for _ in range(15):
-            client.post("/api/visits", json=sample_visit_data)
+        await seed_visits(15)
         
         # Get first page (limit 10)
-        encoded_url = "https%3A%2F%2Fwww.uhcprovider.com%2Fen%2Fhealth-plans.html"
-        response_page1 = client.get(f"/api/visits/url/{encoded_url}?limit=10&offset=0")
+        response_page1 = await async_client.get(f"/api/visits/url/{ENCODED_UHC_URL}?limit=10&offset=0")
         
         # Get second page
-        response_page2 = client.get(f"/api/visits/url/{encoded_url}?limit=10&offset=10")
+        response_page2 = await async_client.get(f"/api/visits/url/{ENCODED_UHC_URL}?limit=10&offset=10")
         
         assert response_page1.status_code == 200
         assert response_page2.status_code == 200
@@ -140,14 +141,37 @@ class TestGetVisitHistory:
         assert len(data_page2["data"]["visits"]) == 5
         
         # Ensure visits are different between pages
-        page1_ids = [v["id"] for v in data_page1["data"]["visits"]]
-        page2_ids = [v["id"] for v in data_page2["data"]["visits"]]
-        assert set(page1_ids).isdisjoint(set(page2_ids))
+        page1_ids = {v["id"] for v in data_page1["data"]["visits"]}
+        assert page1_ids.isdisjoint(v["id"] for v in data_page2["data"]["visits"])
     
+    def test_get_history_cursor_pagination(self, client, sample_visit_data):
+        """Test following next_cursor through the visit history."""
+        client.post("/api/visits/batch", json={"visits": [dict(sample_visit_data)] * 5})
+        
+        page1 = client.get(f"/api/visits/url/{ENCODED_UHC_URL}?limit=3").json()["data"]
+        cursor = page1["next_cursor"]
+        page2 = client.get(f"/api/visits/url/{ENCODED_UHC_URL}", params={"limit": 3, **cursor}).json()["data"]
+        
+        assert page1["total"] == 5
+        assert page2["total"] == 5
+        assert len(page1["visits"]) == 3
+        assert len(page2["visits"]) == 2
+        assert page2["next_cursor"] is None
+        ids = [v["id"] for v in page1["visits"] + page2["visits"]]
+        assert len(set(ids)) == 5
+
+    def test_get_history_host_case_insensitive(self, client, sample_visit_data):
+        """Test visits are found regardless of scheme and host case."""
+        client.post("/api/visits", json={**sample_visit_data, "url": "HTTPS://WWW.UHCProvider.com/en/health-plans.html"})
+
+        data = client.get(f"/api/visits/url/{ENCODED_UHC_URL}").json()["data"]
+
+        assert data["total"] == 1
+        assert data["visits"][0]["url"] == "https://www.uhcprovider.com/en/health-plans.html"
+
     def test_get_history_empty_results(self, client):
         """Test getting history for URL with no visits."""
-        encoded_url = "https%3A%2F%2Fnonexistent.com"
-        response = client.get(f"/api/visits/url/{encoded_url}")
+        response = client.get(f"/api/visits/url/{ENCODED_MISSING_URL}")
         
         assert response.status_code == 200
         data = response.json()
@@ -155,33 +179,32 @@ class TestGetVisitHistory:
         assert data["data"]["total"] == 0
         assert len(data["data"]["visits"]) == 0
     
-    def test_get_history_limit_validation(self, client):
-        """Test limit parameter validation."""
-        encoded_url = "https%3A%2F%2Fexample.com"
-        
-        # Limit too high (max 100)
-        response = client.get(f"/api/visits/url/{encoded_url}?limit=200")
-        assert response.status_code == 422
+    def test_get_history_malformed_url(self, client):
+        """Test a URL that cannot be parsed is looked up as-is rather than erroring."""
+        response = client.get("/api/visits/url/http%3A%2F%2F%5Babc")
         
-        # Limit too low (min 1)
-        response = client.get(f"/api/visits/url/{encoded_url}?limit=0")
-        assert response.status_code == 422
-        
-        # Valid limit
-        response = client.get(f"/api/visits/url/{encoded_url}?limit=50")
         assert response.status_code == 200
+        data = response.json()
+        assert data["data"]["total"] == 0
     
-    def test_get_history_offset_validation(self, client):
+    @pytest.mark.parametrize("limit,status", [
+        (200, 422),  # Limit too high (max 100)
+        (0, 422),    # Limit too low (min 1)
+        (50, 200),
+    ])
+    def test_get_history_limit_validation(self, client, limit, status):
+        """Test limit parameter validation."""
+        response = client.get(f"/api/visits/url/{ENCODED_EXAMPLE_URL}?limit={limit}")
+        assert response.status_code == status
+    
+    @pytest.mark.parametrize("offset,status", [
+        (-1, 422),
+        (0, 200),
+    ])
+    def test_get_history_offset_validation(self, client, offset, status):
         """Test offset parameter validation."""
-        encoded_url = "https%3A%2F%2Fexample.com"
-        
-        # Negative offset
-        response = client.get(f"/api/visits/url/{encoded_url}?offset=-1")
-        assert response.status_code == 422
-        
-        # Valid offset
-        response = client.get(f"/api/visits/url/{encoded_url}?offset=0")
-        assert response.status_code == 200
+        response = client.get(f"/api/visits/url/{ENCODED_EXAMPLE_URL}?offset={offset}")
+        assert response.status_code == status
 
 
 class TestGetLatestVisit:
@@ -190,15 +213,12 @@ class TestGetLatestVisit:
     def test_get_latest_visit_success(self, client, sample_visit_data):
         """Test getting latest visit."""
         # Create two visits
-        client.post("/api/visits", json=sample_visit_data)
+        client.post("/api/visits", json=dict(sample_visit_data))
         
-        modified_data = sample_visit_data.copy()
-        modified_data["link_count"] = 999  # Different count
-        client.post("/api/visits", json=modified_data)
+        client.post("/api/visits", json={**sample_visit_data, "link_count": 999})  # Different count
         
         # Get latest
-        encoded_url = "https%3A%2F%2Fwww.uhcprovider.com%2Fen%2Fhealth-plans.html"
-        response = client.get(f"/api/visits/url/{encoded_url}/latest")
+        response = client.get(f"/api/visits/url/{ENCODED_UHC_URL}/latest")
         
         assert response.status_code == 200
         data = response.json()
@@ -207,8 +227,7 @@ class TestGetLatestVisit:
     
     def test_get_latest_visit_not_found(self, client):
         """Test getting latest visit for non-existent URL."""
-        encoded_url = "https%3A%2F%2Fnonexistent.com"
-        response = client.get(f"/api/visits/url/{encoded_url}/latest")
+        response = client.get(f"/api/visits/url/{ENCODED_MISSING_URL}/latest")
         
         assert response.status_code == 404
         data = response.json()
@@ -233,15 +252,13 @@ class TestGetAllVisits:
         assert data["data"]["total"] == 2
         assert len(data["data"]["visits"]) == 2
     
-    def test_get_all_visits_pagination(self, client, sample_visit_data):
+    async def test_get_all_visits_pagination(self, async_client, seed_visits):
         """Test pagination for all visits."""
-        # Create 25 visits
-        for _ in range(25):
-            client.post("/api/visits", json=sample_visit_data)
+        await seed_visits(25)
         
         # Get first page
-        response_page1 = client.get("/api/visits?limit=10&offset=0")
-        response_page2 = client.get("/api/visits?limit=10&offset=10")
+        response_page1 = await async_client.get("/api/visits?limit=10&offset=0")
+        response_page2 = await async_client.get("/api/visits?limit=10&offset=10")
         
         assert response_page1.status_code == 200
         assert response_page2.status_code == 200
@@ -252,6 +269,17 @@ class TestGetAllVisits:
         assert len(data_page1["data"]["visits"]) == 10
         assert len(data_page2["data"]["visits"]) == 10
     
+    def test_get_all_visits_cursor_pagination(self, client, sample_visits_batch):
+        """Test following next_cursor across all visits."""
+        client.post("/api/visits/batch", json={"visits": sample_visits_batch * 2})
+        
+        page1 = client.get("/api/visits?limit=3").json()["data"]
+        page2 = client.get("/api/visits", params={"limit": 3, **page1["next_cursor"]}).json()["data"]
+        
+        assert len(page1["visits"]) == 3
+        assert len(page2["visits"]) == 1
+        assert page2["next_cursor"] is None
+    
     def test_get_all_visits_empty(self, client):
         """Test getting all visits when none exist."""
         response = client.get("/api/visits")
@@ -262,42 +290,120 @@ class TestGetAllVisits:
         assert data["data"]["total"] == 0
         assert len(data["data"]["visits"]) == 0
     
-    def test_get_all_visits_limit_validation(self, client):
+    @pytest.mark.parametrize("limit,status", [
+        (1000, 422),  # Limit too high (max 500)
+        (100, 200),
+    ])
+    def test_get_all_visits_limit_validation(self, client, limit, status):
         """Test limit validation for get all visits."""
-        # Limit too high (max 500)
-        response = client.get("/api/visits?limit=1000")
-        assert response.status_code == 422
+        response = client.get(f"/api/visits?limit={limit}")
+        assert response.status_code == status
+    
+    def test_get_all_visits_gzip(self, client, sample_visit_data):
+        """Test large listings are gzip-compressed when the client accepts it."""
+        client.post("/api/visits/batch", json={"visits": [dict(sample_visit_data)] * 20})
+        
+        response = client.get("/api/visits", headers={"Accept-Encoding": "gzip"})
         
-        # Valid limit
-        response = client.get("/api/visits?limit=100")
         assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        data = response.json()
+        assert len(data["data"]["visits"]) == 20
 
 
 class TestVisitOrdering:
     """Test that visits are ordered correctly."""
     
-    def test_visits_ordered_by_datetime_desc(self, client, sample_visit_data):
+    async def test_visits_ordered_by_datetime_desc(self, async_client, seed_visits):
         """Test visits are returned in reverse chronological order."""
         # Create visits with different timestamps
-        visit1 = sample_visit_data.copy()
-        visit1["datetime_visited"] = "2024-01-15T10:00:00"
-        client.post("/api/visits", json=visit1)
-        
-        visit2 = sample_visit_data.copy()
-        visit2["datetime_visited"] = "2024-01-15T11:00:00"
-        client.post("/api/visits", json=visit2)
-        
-        visit3 = sample_visit_data.copy()
-        visit3["datetime_visited"] = "2024-01-15T12:00:00"
-        client.post("/api/visits", json=visit3)
+        await seed_visits(rows=[
+            {"datetime_visited": "2024-01-15T10:00:00"},
+            {"datetime_visited": "2024-01-15T11:00:00"},
+            {"datetime_visited": "2024-01-15T12:00:00"},
+        ])
         
         # Get visits
-        encoded_url = "https%3A%2F%2Fwww.uhcprovider.com%2Fen%2Fhealth-plans.html"
-        response = client.get(f"/api/visits/url/{encoded_url}")
+        response = await async_client.get(f"/api/visits/url/{ENCODED_UHC_URL}")
         
         visits = response.json()["data"]["visits"]
         
         # Most recent should be first
         assert "12:00:00" in visits[0]["datetime_visited"]
         assert "11:00:00" in visits[1]["datetime_visited"]
-        assert "10:00:00" in visits[2]["datetime_visited"]
\ No newline at end of file
+        assert "10:00:00" in visits[2]["datetime_visited"]
+
+class TestVisitCache:
+    """Test routes read from and invalidate the response cache."""
+    
+    def test_history_cache_hit_skips_database(self, client):
+        """Test a cached URL history is served without querying visits."""
+        cached = {"success": True, "message": "Success", "data": {"visits": [], "total": 7, "next_cursor": None}}
+        redis_client = AsyncMock()
+        redis_client.hget.return_value = orjson.dumps(cached)
+        
+        with patch.object(cache, "redis_client", redis_client), \
+                patch.object(crud, "get_visits_with_total_by_url", new_callable=AsyncMock) as get_visits:
+            response = client.get(f"/api/visits/url/{ENCODED_UHC_URL}")
+        
+        assert response.json() == cached
+        get_visits.assert_not_awaited()
+        redis_client.hget.assert_awaited_once_with(
+            "visits:url:https://www.uhcprovider.com/en/health-plans.html", "list:50:0:None:None"
+        )
+    
+    def test_all_visits_cache_hit_skips_database(self, client):
+        """Test a cached all-visits listing is served without querying visits."""
+        cached = {"success": True, "message": "Success", "data": {"visits": [], "total": 3, "next_cursor": None}}
+        redis_client = AsyncMock()
+        redis_client.hget.return_value = orjson.dumps(cached)
+        
+        with patch.object(cache, "redis_client", redis_client), \
+                patch.object(crud, "get_all_visits", new_callable=AsyncMock) as get_all:
+            response = client.get("/api/visits")
+        
+        assert response.json() == cached
+        get_all.assert_not_awaited()
+    
+    def test_cache_miss_stores_response(self, client, sample_visit_data):
+        """Test a miss queries the database and caches the response."""
+        client.post("/api/visits", json=dict(sample_visit_data))
+        redis_client = AsyncMock()
+        redis_client.hget.return_value = None
+        
+        with patch.object(cache, "redis_client", redis_client), \
+                patch.object(cache, "set_cached", new_callable=AsyncMock) as set_cached:
+            data = client.get(f"/api/visits/url/{ENCODED_UHC_URL}").json()
+        
+        assert data["data"]["total"] == 1
+        set_cached.assert_awaited_once_with(
+            "visits:url:https://www.uhcprovider.com/en/health-plans.html", data,
+            cache.CACHE_TTL_LONG, "list:50:0:None:None"
+        )
+    
+    def test_create_invalidates_url_and_listing(self, client, sample_visit_data):
+        """Test a new visit drops the cached history for its URL and the listing."""
+        redis_client = AsyncMock()
+        
+        with patch.object(cache, "redis_client", redis_client):
+            response = client.post(
+                "/api/visits", json={**sample_visit_data, "url": "HTTPS://WWW.UHCProvider.com/en/health-plans.html"}
+            )
+        
+        assert response.status_code == 201
+        redis_client.delete.assert_awaited_once_with(
+            "visits:url:https://www.uhcprovider.com/en/health-plans.html", "visits:all"
+        )
+    
+    def test_batch_invalidates_every_url(self, client, sample_visits_batch):
+        """Test a batch drops each URL's cached history and the listing in one DEL."""
+        redis_client = AsyncMock()
+        
+        with patch.object(cache, "redis_client", redis_client):
+            response = client.post("/api/visits/batch", json={"visits": sample_visits_batch * 2})
+        
+        assert response.status_code == 201
+        redis_client.delete.assert_awaited_once()
+        deleted = redis_client.delete.await_args.args
+        assert len(deleted) == 3
+        assert set(deleted) == {"visits:url:https://www.uhcprovider.com", "visits:url:https://www.aetna.com", "visits:all"}
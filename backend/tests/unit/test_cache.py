@@ -0,0 +1,115 @@
+"""
+Unit tests for the Redis response cache helpers.
+"""
+import orjson
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+from uuid import UUID
+from redis.exceptions import RedisError
+
+from app import cache
+from app.schemas import PageVisitResponse
+
+
+class TestCacheDisabled:
+    """Test cache helpers when REDIS_URL is not configured."""
+
+    async def test_get_returns_none(self):
+        """Test reads miss when caching is disabled."""
+        with patch.object(cache, "redis_client", None):
+            assert await cache.get_cached(cache.health_key()) is None
+
+    async def test_set_and_invalidate_are_noops(self):
+        """Test writes and invalidation do nothing when caching is disabled."""
+        with patch.object(cache, "redis_client", None):
+            await cache.set_cached(cache.health_key(), {"success": True}, cache.CACHE_TTL_SHORT)
+            await cache.invalidate_url("https://example.com")
+
+
+class TestCacheEnabled:
+    """Test cache helpers against a mocked Redis client."""
+
+    async def test_get_decodes_plain_key(self):
+        """Test cached JSON is decoded on a hit."""
+        client = AsyncMock()
+        client.get.return_value = orjson.dumps({"success": True})
+
+        with patch.object(cache, "redis_client", client):
+            result = await cache.get_cached(cache.health_key())
+
+        assert result == {"success": True}
+        client.get.assert_awaited_once_with("visits:health")
+
+    async def test_get_reads_hash_field(self):
+        """Test per-URL entries are read from the URL hash."""
+        client = AsyncMock()
+        client.hget.return_value = None
+
+        with patch.object(cache, "redis_client", client):
+            result = await cache.get_cached(cache.url_key("https://example.com"), "latest")
+
+        assert result is None
+        client.hget.assert_awaited_once_with("visits:url:https://example.com", "latest")
+
+    async def test_set_encodes_json(self):
+        """Test values are JSON-encoded with the requested expiry."""
+        client = AsyncMock()
+
+        with patch.object(cache, "redis_client", client):
+            await cache.set_cached(cache.health_key(), {"success": True}, cache.CACHE_TTL_SHORT)
+
+        client.set.assert_awaited_once_with(
+            "visits:health", orjson.dumps({"success": True}), ex=cache.CACHE_TTL_SHORT
+        )
+
+    async def test_set_encodes_models_and_uuid_subclasses(self):
+        """Test Pydantic models and UUID subclasses (as returned by asyncpg) are encoded."""
+        class DriverUUID(UUID):
+            pass
+
+        client = AsyncMock()
+        visit_id = DriverUUID("550e8400-e29b-41d4-a716-446655440000")
+        visit = PageVisitResponse(
+            id=visit_id,
+            url="https://example.com",
+            datetime_visited=datetime(2024, 1, 15, 10, 30, 0),
+            link_count=10,
+            word_count=500,
+            image_count=5,
+            created_at=datetime(2024, 1, 15, 10, 30, 0)
+        )
+
+        with patch.object(cache, "redis_client", client):
+            await cache.set_cached(cache.all_visits_key(), {"visits": [visit], "id": visit_id}, cache.CACHE_TTL_NORMAL)
+
+        payload = orjson.loads(client.set.await_args.args[1])
+        assert payload["id"] == "550e8400-e29b-41d4-a716-446655440000"
+        assert payload["visits"][0]["datetime_visited"] == "2024-01-15T10:30:00"
+
+    async def test_invalidate_url(self):
+        """Test a new visit drops the URL hash and the all-visits listing."""
+        client = AsyncMock()
+
+        with patch.object(cache, "redis_client", client):
+            await cache.invalidate_url("https://example.com")
+
+        client.delete.assert_awaited_once_with("visits:url:https://example.com", "visits:all")
+
+    async def test_invalidate_several_urls_in_one_delete(self):
+        """Test several URLs are dropped together with the listing in one DEL."""
+        client = AsyncMock()
+
+        with patch.object(cache, "redis_client", client):
+            await cache.invalidate_url("https://example.com", "https://other.com")
+
+        client.delete.assert_awaited_once_with(
+            "visits:url:https://example.com", "visits:url:https://other.com", "visits:all"
+        )
+
+    async def test_read_error_is_a_miss(self):
+        """Test Redis errors are treated as a cache miss."""
+        client = AsyncMock()
+        client.get.side_effect = RedisError("Connection refused")
+
+        with patch.object(cache, "redis_client", client):
+            assert await cache.get_cached(cache.health_key()) is None
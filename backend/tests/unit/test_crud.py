@@ -4,16 +4,17 @@ Unit tests for CRUD operations.
 import pytest
 from unittest.mock import patch
 from sqlalchemy.exc import SQLAlchemyError
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
-from app import crud
-from app.schemas import PageVisitCreate
+from app import crud, models
+from app.models import UrlStats, hash_url
+from app.schemas import PageVisitCreate, PageVisitResponse
 
 
 class TestCreatePageVisit:
     """Test create_page_visit function."""
     
-    def test_create_visit_success(self, db_session):
+    async def test_create_visit_success(self, db_session):
         """Test successful visit creation."""
         visit_data = PageVisitCreate(
             url="https://example.com",
@@ -22,7 +23,7 @@ class TestCreatePageVisit:
             image_count=5
         )
         
-        result = crud.create_page_visit(db_session, visit_data)
+        result = await crud.create_page_visit(db_session, visit_data)
         
         assert result.id is not None
         assert result.url == "https://example.com"
@@ -32,7 +33,7 @@ class TestCreatePageVisit:
         assert result.created_at is not None
         assert result.datetime_visited is not None
     
-    def test_create_visit_with_timestamp(self, db_session):
+    async def test_create_visit_with_timestamp(self, db_session):
         """Test creating visit with explicit timestamp."""
         visit_time = datetime(2024, 1, 15, 10, 30, 0)
         visit_data = PageVisitCreate(
@@ -43,11 +44,11 @@ class TestCreatePageVisit:
             image_count=5
         )
         
-        result = crud.create_page_visit(db_session, visit_data)
+        result = await crud.create_page_visit(db_session, visit_data)
         
         assert result.datetime_visited == visit_time
     
-    def test_create_visit_without_timestamp(self, db_session):
+    async def test_create_visit_without_timestamp(self, db_session):
         """Test creating visit without timestamp uses current time."""
         visit_data = PageVisitCreate(
             url="https://example.com",
@@ -56,13 +57,14 @@ class TestCreatePageVisit:
             image_count=5
         )
         
-        before = datetime.utcnow()
-        result = crud.create_page_visit(db_session, visit_data)
-        after = datetime.utcnow()
+        now = datetime(2024, 1, 15, 10, 30, 0)
+        with patch.object(crud, "datetime") as mock_datetime:
+            mock_datetime.utcnow.return_value = now
+            result = await crud.create_page_visit(db_session, visit_data)
         
-        assert before <= result.datetime_visited <= after
+        assert result.datetime_visited == now
     
-    def test_create_visit_with_zero_counts(self, db_session):
+    async def test_create_visit_with_zero_counts(self, db_session):
         """Test creating visit with zero counts."""
         visit_data = PageVisitCreate(
             url="https://example.com",
@@ -71,13 +73,29 @@ class TestCreatePageVisit:
             image_count=0
         )
         
-        result = crud.create_page_visit(db_session, visit_data)
+        result = await crud.create_page_visit(db_session, visit_data)
         
         assert result.link_count == 0
         assert result.word_count == 0
         assert result.image_count == 0
-    
-    def test_create_visit_database_error(self, db_session):
+
+    async def test_create_visit_ids_are_time_ordered(self, db_session):
+        """Test visit ids are UUIDv7 with non-decreasing timestamps."""
+        visit_data = PageVisitCreate(
+            url="https://example.com",
+            link_count=10,
+            word_count=500,
+            image_count=5
+        )
+
+        first = await crud.create_page_visit(db_session, visit_data)
+        second = await crud.create_page_visit(db_session, visit_data)
+
+        assert first.id.version == 7
+        assert second.id.version == 7
+        assert first.id.int >> 80 <= second.id.int >> 80
+
+    async def test_create_visit_database_error(self, db_session):
         """Test handling database errors during creation."""
         visit_data = PageVisitCreate(
             url="https://example.com",
@@ -88,40 +106,59 @@ class TestCreatePageVisit:
         
         with patch.object(db_session, 'commit', side_effect=SQLAlchemyError("DB Error")):
             with pytest.raises(SQLAlchemyError):
-                crud.create_page_visit(db_session, visit_data)
+                await crud.create_page_visit(db_session, visit_data)
+
+
+class TestCreatePageVisits:
+    """Test create_page_visits function."""
+    
+    async def test_create_visits_batch(self, db_session):
+        """Test creating several visits in one insert."""
+        visits = [
+            PageVisitCreate(url="https://example.com", link_count=1, word_count=500, image_count=5),
+            PageVisitCreate(
+                url="https://other.com",
+                datetime_visited=datetime(2024, 1, 15, 10, 30, 0),
+                link_count=2, word_count=600, image_count=6
+            ),
+        ]
+        
+        result = await crud.create_page_visits(db_session, visits)
+        
+        assert [v.url for v in result] == ["https://example.com", "https://other.com"]
+        assert all(v.id is not None and v.created_at is not None for v in result)
+        assert result[0].datetime_visited is not None
+        assert result[1].datetime_visited == datetime(2024, 1, 15, 10, 30, 0)
+        assert [v.url_hash for v in result] == [hash_url("https://example.com"), hash_url("https://other.com")]
+        assert len(await crud.get_all_visits(db_session)) == 2
 
 
 class TestGetVisitsByUrl:
     """Test get_visits_by_url function."""
     
-    def test_get_visits_by_url_success(self, db_session):
+    async def test_get_visits_by_url_success(self, db_session):
         """Test getting visits for a specific URL."""
         # Create visits
         visit1 = PageVisitCreate(url="https://example.com", link_count=10, word_count=500, image_count=5)
         visit2 = PageVisitCreate(url="https://example.com", link_count=15, word_count=600, image_count=6)
         visit3 = PageVisitCreate(url="https://other.com", link_count=20, word_count=700, image_count=7)
         
-        crud.create_page_visit(db_session, visit1)
-        crud.create_page_visit(db_session, visit2)
-        crud.create_page_visit(db_session, visit3)
+        await crud.create_page_visits(db_session, [visit1, visit2, visit3])
         
         # Get visits for example.com
-        visits = crud.get_visits_by_url(db_session, "https://example.com")
+        visits = await crud.get_visits_by_url(db_session, "https://example.com")
         
         assert len(visits) == 2
         assert all(v.url == "https://example.com" for v in visits)
     
-    def test_get_visits_pagination(self, db_session):
+    async def test_get_visits_pagination(self, db_session, seed_visits):
         """Test pagination of visits."""
-        # Create 25 visits
-        for i in range(25):
-            visit = PageVisitCreate(url="https://example.com", link_count=i, word_count=500, image_count=5)
-            crud.create_page_visit(db_session, visit)
+        await seed_visits(25, url="https://example.com")
         
         # Get first page (10 results)
-        page1 = crud.get_visits_by_url(db_session, "https://example.com", limit=10, offset=0)
-        page2 = crud.get_visits_by_url(db_session, "https://example.com", limit=10, offset=10)
-        page3 = crud.get_visits_by_url(db_session, "https://example.com", limit=10, offset=20)
+        page1 = await crud.get_visits_by_url(db_session, "https://example.com", limit=10, offset=0)
+        page2 = await crud.get_visits_by_url(db_session, "https://example.com", limit=10, offset=10)
+        page3 = await crud.get_visits_by_url(db_session, "https://example.com", limit=10, offset=20)
         
         assert len(page1) == 10
         assert len(page2) == 10
@@ -129,15 +166,65 @@ class TestGetVisitsByUrl:
         
         # Ensure no duplicates between pages
         page1_ids = {v.id for v in page1}
-        page2_ids = {v.id for v in page2}
-        assert page1_ids.isdisjoint(page2_ids)
+        assert page1_ids.isdisjoint(v.id for v in page2)
+    
+    async def test_get_visits_keyset_pagination(self, db_session):
+        """Test walking pages with a keyset cursor, including tied timestamps."""
+        # One batch shares a single timestamp, so the id tie-breaker matters
+        base = PageVisitCreate(url="https://example.com", link_count=0, word_count=500, image_count=5)
+        visits = [base.model_copy(update={"link_count": i}) for i in range(7)]
+        await crud.create_page_visits(db_session, visits)
+        
+        seen = []
+        after = after_id = None
+        while True:
+            page = await crud.get_visits_by_url(
+                db_session, "https://example.com", limit=3, after=after, after_id=after_id
+            )
+            seen.extend(v.id for v in page)
+            if len(page) < 3:
+                break
+            after, after_id = page[-1].datetime_visited, page[-1].id
+        
+        assert len(seen) == 7
+        assert len(set(seen)) == 7
+    
+    async def test_get_visits_aware_cursor(self, db_session, seed_visits):
+        """Test a timezone-aware cursor is compared as naive UTC."""
+        await seed_visits(url="https://example.com", rows=[
+            {"datetime_visited": datetime(2024, 1, 15, hour, 0, 0)} for hour in (10, 11, 12)
+        ])
+        
+        visits = await crud.get_visits_by_url(
+            db_session, "https://example.com",
+            after=datetime(2024, 1, 15, 13, 0, 0, tzinfo=timezone(timedelta(hours=2)))
+        )
+        
+        assert [v.datetime_visited for v in visits] == [datetime(2024, 1, 15, 10, 0, 0)]
+    
+    async def test_get_visits_url_hash_collision(self, db_session):
+        """Test URLs sharing a url_hash are still told apart."""
+        with patch.object(models, "hash_url", return_value=42), \
+                patch.object(crud, "hash_url", return_value=42):
+            await crud.create_page_visit(
+                db_session,
+                PageVisitCreate(url="https://example.com", link_count=10, word_count=500, image_count=5)
+            )
+            await crud.create_page_visit(
+                db_session,
+                PageVisitCreate(url="https://other.com", link_count=20, word_count=600, image_count=6)
+            )
+            
+            visits = await crud.get_visits_by_url(db_session, "https://example.com")
+        
+        assert [(v.url, v.url_hash) for v in visits] == [("https://example.com", 42)]
     
-    def test_get_visits_nonexistent_url(self, db_session):
+    async def test_get_visits_nonexistent_url(self, db_session):
         """Test getting visits for URL with no visits."""
-        visits = crud.get_visits_by_url(db_session, "https://nonexistent.com")
+        visits = await crud.get_visits_by_url(db_session, "https://nonexistent.com")
         assert len(visits) == 0
     
-    def test_get_visits_ordered_desc(self, db_session):
+    async def test_get_visits_ordered_desc(self, db_session):
         """Test visits are ordered by datetime descending."""
         # Create visits with specific timestamps
         visit1 = PageVisitCreate(
@@ -156,11 +243,9 @@ class TestGetVisitsByUrl:
             link_count=3, word_count=500, image_count=5
         )
         
-        crud.create_page_visit(db_session, visit1)
-        crud.create_page_visit(db_session, visit2)
-        crud.create_page_visit(db_session, visit3)
+        await crud.create_page_visits(db_session, [visit1, visit2, visit3])
         
-        visits = crud.get_visits_by_url(db_session, "https://example.com")
+        visits = await crud.get_visits_by_url(db_session, "https://example.com")
         
         # Most recent first
         assert visits[0].link_count == 3
@@ -168,10 +253,57 @@ class TestGetVisitsByUrl:
         assert visits[2].link_count == 1
 
 
+class TestGetVisitsWithTotalByUrl:
+    """Test get_visits_with_total_by_url function."""
+    
+    async def test_page_and_total(self, db_session, seed_visits):
+        """Test a page of visits is returned with the full count."""
+        await seed_visits(12, url="https://example.com")
+        await seed_visits(url="https://other.com")
+        
+        visits, total = await crud.get_visits_with_total_by_url(
+            db_session, "https://example.com", limit=5, offset=0
+        )
+        
+        assert len(visits) == 5
+        assert total == 12
+        assert all(v.url == "https://example.com" for v in visits)
+    
+    async def test_page_and_total_in_one_query(self, db_session, seed_visits):
+        """Test a non-empty page reads its total in the same query."""
+        await seed_visits(3, url="https://example.com")
+        
+        with patch.object(db_session, "execute", wraps=db_session.execute) as execute, \
+                patch.object(db_session, "scalar", wraps=db_session.scalar) as scalar:
+            visits, total = await crud.get_visits_with_total_by_url(db_session, "https://example.com")
+        
+        assert (len(visits), total) == (3, 3)
+        assert execute.await_count == 1
+        scalar.assert_not_awaited()
+    
+    async def test_offset_past_end_keeps_total(self, db_session, seed_visits):
+        """Test an empty page past the end still reports the total."""
+        await seed_visits(3, url="https://example.com")
+        
+        visits, total = await crud.get_visits_with_total_by_url(
+            db_session, "https://example.com", limit=10, offset=10
+        )
+        
+        assert visits == []
+        assert total == 3
+    
+    async def test_nonexistent_url(self, db_session):
+        """Test URL with no visits returns an empty page and zero total."""
+        visits, total = await crud.get_visits_with_total_by_url(db_session, "https://nonexistent.com")
+        
+        assert visits == []
+        assert total == 0
+
+
 class TestGetLatestVisitByUrl:
     """Test get_latest_visit_by_url function."""
     
-    def test_get_latest_visit_success(self, db_session):
+    async def test_get_latest_visit_success(self, db_session):
         """Test getting latest visit."""
         visit1 = PageVisitCreate(
             url="https://example.com",
@@ -184,63 +316,113 @@ class TestGetLatestVisitByUrl:
             link_count=20, word_count=600, image_count=6
         )
         
-        crud.create_page_visit(db_session, visit1)
-        crud.create_page_visit(db_session, visit2)
+        await crud.create_page_visits(db_session, [visit1, visit2])
         
-        latest = crud.get_latest_visit_by_url(db_session, "https://example.com")
+        latest = await crud.get_latest_visit_by_url(db_session, "https://example.com")
         
         assert latest is not None
         assert latest.link_count == 20  # Latest visit
     
-    def test_get_latest_visit_nonexistent(self, db_session):
+    async def test_get_latest_visit_nonexistent(self, db_session):
         """Test getting latest visit for non-existent URL."""
-        latest = crud.get_latest_visit_by_url(db_session, "https://nonexistent.com")
+        latest = await crud.get_latest_visit_by_url(db_session, "https://nonexistent.com")
         assert latest is None
 
 
 class TestGetVisitCountByUrl:
     """Test get_visit_count_by_url function."""
     
-    def test_count_visits(self, db_session):
+    async def test_count_visits(self, db_session, seed_visits):
         """Test counting visits for a URL."""
-        # Create 5 visits
-        for _ in range(5):
-            visit = PageVisitCreate(url="https://example.com", link_count=10, word_count=500, image_count=5)
-            crud.create_page_visit(db_session, visit)
+        await seed_visits(5, url="https://example.com")
         
-        count = crud.get_visit_count_by_url(db_session, "https://example.com")
+        count = await crud.get_visit_count_by_url(db_session, "https://example.com")
         assert count == 5
     
-    def test_count_nonexistent_url(self, db_session):
+    async def test_count_nonexistent_url(self, db_session):
         """Test counting visits for non-existent URL."""
-        count = crud.get_visit_count_by_url(db_session, "https://nonexistent.com")
+        count = await crud.get_visit_count_by_url(db_session, "https://nonexistent.com")
         assert count == 0
 
 
+class TestUrlStats:
+    """Test the url_stats counters maintained on insert."""
+    
+    async def test_counts_single_and_batch_inserts(self, db_session):
+        """Test single and batch inserts both update the per-URL counters."""
+        await crud.create_page_visit(
+            db_session,
+            PageVisitCreate(url="https://example.com", link_count=10, word_count=500, image_count=5)
+        )
+        await crud.create_page_visits(db_session, [
+            PageVisitCreate(url="https://example.com", link_count=1, word_count=500, image_count=5),
+            PageVisitCreate(url="https://other.com", link_count=2, word_count=500, image_count=5),
+            PageVisitCreate(url="https://example.com", link_count=3, word_count=500, image_count=5),
+        ])
+        
+        assert await crud.get_visit_count_by_url(db_session, "https://example.com") == 3
+        assert await crud.get_visit_count_by_url(db_session, "https://other.com") == 1
+    
+    async def test_batch_mixing_utc_and_missing_timestamps(self, db_session):
+        """Test one URL visited with a "Z" timestamp and without one in the same batch."""
+        await crud.create_page_visits(db_session, [
+            PageVisitCreate(
+                url="https://example.com", datetime_visited="2024-01-15T10:30:00Z",
+                link_count=1, word_count=500, image_count=5
+            ),
+            PageVisitCreate(url="https://example.com", link_count=2, word_count=500, image_count=5),
+        ])
+        
+        stats = await db_session.get(UrlStats, "https://example.com")
+        
+        assert stats.visit_count == 2
+        assert stats.last_visited > datetime(2024, 1, 15, 10, 30, 0)
+    
+    async def test_last_visited_keeps_newest(self, db_session):
+        """Test an older visit arriving later does not move last_visited back."""
+        for hour in (11, 10):
+            await crud.create_page_visit(db_session, PageVisitCreate(
+                url="https://example.com",
+                datetime_visited=datetime(2024, 1, 15, hour, 0, 0),
+                link_count=10, word_count=500, image_count=5
+            ))
+        
+        stats = await db_session.get(UrlStats, "https://example.com")
+        
+        assert stats.visit_count == 2
+        assert stats.last_visited == datetime(2024, 1, 15, 11, 0, 0)
+
+
 class TestGetAllVisits:
     """Test get_all_visits function."""
     
-    def test_get_all_visits(self, db_session):
+    async def test_get_all_visits(self, db_session):
         """Test getting all visits across URLs."""
         visit1 = PageVisitCreate(url="https://example.com", link_count=10, word_count=500, image_count=5)
         visit2 = PageVisitCreate(url="https://other.com", link_count=15, word_count=600, image_count=6)
         
-        crud.create_page_visit(db_session, visit1)
-        crud.create_page_visit(db_session, visit2)
+        await crud.create_page_visits(db_session, [visit1, visit2])
         
-        visits = crud.get_all_visits(db_session)
+        visits = await crud.get_all_visits(db_session)
         
         assert len(visits) == 2
     
-    def test_get_all_visits_pagination(self, db_session):
+    async def test_get_all_visits_pagination(self, db_session, seed_visits):
         """Test pagination for all visits."""
-        # Create 15 visits
-        for i in range(15):
-            visit = PageVisitCreate(url=f"https://example{i}.com", link_count=10, word_count=500, image_count=5)
-            crud.create_page_visit(db_session, visit)
+        await seed_visits(rows=[{"url": f"https://example{i}.com"} for i in range(15)])
         
-        page1 = crud.get_all_visits(db_session, limit=10, offset=0)
-        page2 = crud.get_all_visits(db_session, limit=10, offset=10)
+        page1 = await crud.get_all_visits(db_session, limit=10, offset=0)
+        page2 = await crud.get_all_visits(db_session, limit=10, offset=10)
         
         assert len(page1) == 10
-        assert len(page2) == 5
\ No newline at end of file
+        assert len(page2) == 5
+    
+    async def test_get_all_visits_returns_response_fields(self, db_session):
+        """Test rows carry exactly the PageVisitResponse fields."""
+        visit = PageVisitCreate(url="https://example.com", link_count=10, word_count=500, image_count=5)
+        await crud.create_page_visit(db_session, visit)
+        
+        visits = await crud.get_all_visits(db_session)
+        
+        assert set(visits[0]) == set(PageVisitResponse.model_fields)
+        assert PageVisitResponse.model_validate(visits[0]).url == "https://example.com"
\ No newline at end of file
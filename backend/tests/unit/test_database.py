@@ -0,0 +1,109 @@
+"""
+Unit tests for database session configuration.
+"""
+import pytest
+from unittest.mock import AsyncMock, patch
+from sqlalchemy import Column, ForeignKey, Integer, select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import declarative_base, relationship, selectinload
+
+from app import database
+
+# Standalone models so the app schema stays untouched
+LazyBase = declarative_base()
+
+
+class Parent(LazyBase):
+    __tablename__ = "parents"
+    id = Column(Integer, primary_key=True)
+    children = relationship("Child")
+
+
+class Child(LazyBase):
+    __tablename__ = "children"
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey("parents.id"))
+
+
+@pytest.fixture
+async def lazy_session():
+    """Session over a throwaway database holding one parent with one child."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(LazyBase.metadata.create_all)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add(Parent(id=1, children=[Child(id=1)]))
+        await session.commit()
+        session.expunge_all()
+        yield session
+
+    await engine.dispose()
+
+
+class TestRaiseOnLazyLoad:
+    """Test lazy relationship loads are rejected outside production."""
+
+    def test_enabled_in_tests(self):
+        """Test the guard is active under the test environment."""
+        assert database.RAISE_ON_LAZY_LOAD is True
+
+    async def test_lazy_load_raises(self, lazy_session):
+        """Test accessing an unloaded relationship raises instead of querying."""
+        parent = await lazy_session.scalar(select(Parent))
+
+        with pytest.raises(InvalidRequestError, match="raise_on_sql"):
+            parent.children
+
+    async def test_eager_load_allowed(self, lazy_session):
+        """Test relationships loaded up front remain accessible."""
+        parent = await lazy_session.scalar(
+            select(Parent).options(selectinload(Parent.children))
+        )
+
+        assert [child.id for child in parent.children] == [1]
+
+
+class TestGetDb:
+    """Test the get_db session dependency."""
+
+    async def test_session_closed_after_request(self):
+        """Test the session is closed when the request finishes."""
+        with patch.object(AsyncSession, "close", new_callable=AsyncMock) as close:
+            gen = database.get_db()
+            await gen.__anext__()
+            await gen.aclose()
+
+        close.assert_awaited_once()
+
+    async def test_session_closed_on_error(self):
+        """Test the session is closed when the request handler raises."""
+        with patch.object(AsyncSession, "close", new_callable=AsyncMock) as close:
+            gen = database.get_db()
+            await gen.__anext__()
+            with pytest.raises(RuntimeError):
+                await gen.athrow(RuntimeError("handler failed"))
+
+        close.assert_awaited_once()
+
+
+class TestPoolLimits:
+    """Test the connection budget is split between worker pools."""
+
+    @pytest.mark.parametrize("workers", [1, 2, 4, 8, 16, 40])
+    def test_workers_stay_within_budget(self, workers):
+        """Test all workers' pools together never exceed the budget."""
+        pool_size, max_overflow = database._pool_limits(80, workers)
+
+        assert workers * (pool_size + max_overflow) <= 80
+        assert pool_size >= 1
+
+    def test_single_worker_gets_whole_budget(self):
+        """Test one worker splits the budget between pool and overflow."""
+        assert database._pool_limits(80, 1) == (40, 40)
+
+    def test_oversubscribed_budget_is_rejected(self):
+        """Test more workers than the budget can give 2 connections each fails loudly."""
+        with pytest.raises(ValueError, match="WEB_CONCURRENCY"):
+            database._pool_limits(80, 41)
@@ -1,7 +1,7 @@
 """
 Unit tests for response helper functions.
 """
-import json
+import orjson
 from app.response import success_response, error_response
 
 
@@ -63,7 +63,7 @@ class TestErrorResponse:
         response = error_response(message="Error occurred")
         
         assert response.status_code == 400
-        body = json.loads(response.body)
+        body = orjson.loads(response.body)
         assert body["success"] is False
         assert body["message"] == "Error occurred"
     
@@ -75,7 +75,7 @@ class TestErrorResponse:
         )
         
         assert response.status_code == 404
-        body = json.loads(response.body)
+        body = orjson.loads(response.body)
         assert body["success"] is False
         assert body["message"] == "Not found"
     
@@ -88,7 +88,7 @@ class TestErrorResponse:
         )
         
         assert response.status_code == 422
-        body = json.loads(response.body)
+        body = orjson.loads(response.body)
         assert body["success"] is False
         assert body["message"] == "Validation failed"
         assert "errors" in body
@@ -107,7 +107,7 @@ class TestErrorResponse:
         )
         
         assert response.status_code == 503
-        body = json.loads(response.body)
+        body = orjson.loads(response.body)
         assert body["success"] is False
         assert body["message"] == "Service unavailable"
         assert "data" in body
@@ -118,7 +118,7 @@ class TestErrorResponse:
         """Test error response without optional fields."""
         response = error_response(message="Simple error")
         
-        body = json.loads(response.body)
+        body = orjson.loads(response.body)
         assert body["success"] is False
         assert body["message"] == "Simple error"
         assert "errors" not in body
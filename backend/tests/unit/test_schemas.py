@@ -2,164 +2,138 @@
 Unit tests for Pydantic schemas.
 """
 import pytest
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 from datetime import datetime
+from operator import itemgetter
+from types import MappingProxyType, SimpleNamespace
+from uuid import UUID
 
-from app.schemas import PageVisitCreate, PageVisitResponse, PageVisitList
+from app.schemas import PageVisitCreate, PageVisitResponse, PageVisitList, visit_list_adapter
+
+
+# Validates raw payloads in rejection tests without going through __init__
+CREATE_ADAPTER = TypeAdapter(PageVisitCreate)
+
+VISIT_TIME = datetime(2024, 1, 15, 10, 30, 0)
+
+# Shared read-only payloads; tests merge overrides into new dicts
+BASE_CREATE = MappingProxyType({
+    "url": "https://example.com",
+    "link_count": 10,
+    "word_count": 500,
+    "image_count": 5
+})
+
+RESPONSE_DATA = MappingProxyType({
+    **BASE_CREATE,
+    "id": "550e8400-e29b-41d4-a716-446655440000",
+    "datetime_visited": VISIT_TIME,
+    "created_at": VISIT_TIME
+})
+
+VALID_CASES = [
+    pytest.param(BASE_CREATE, id="basic"),
+    pytest.param({**BASE_CREATE, "datetime_visited": VISIT_TIME}, id="with_timestamp"),
+    pytest.param({**BASE_CREATE, "link_count": 0, "word_count": 0, "image_count": 0}, id="zero_counts"),
+]
+
+# Invalid payloads with the expected pydantic error type and field
+INVALID_CASES = [
+    pytest.param({**BASE_CREATE, "link_count": -1}, "greater_than_equal", "link_count", id="negative_count"),
+    pytest.param({**BASE_CREATE, "url": 12345}, "string_type", "url", id="invalid_url_type"),
+    pytest.param({**BASE_CREATE, "link_count": "ten"}, "int_parsing", "link_count", id="invalid_count_type"),
+]
+
+
+@pytest.fixture(scope="session")
+def sample_response():
+    """
+    PageVisitResponse matching RESPONSE_DATA, built once without validation.
+    """
+    return PageVisitResponse.model_construct(**{**RESPONSE_DATA, "id": UUID(RESPONSE_DATA["id"])})
+
+
+@pytest.fixture(scope="session")
+def required_create_fields():
+    """
+    Names of the required PageVisitCreate fields, read from the model once.
+    """
+    return frozenset(name for name, field in PageVisitCreate.model_fields.items() if field.is_required())
 
 
 class TestPageVisitCreate:
     """Test PageVisitCreate schema validation."""
     
-    def test_valid_visit_create(self):
-        """Test creating valid PageVisitCreate."""
-        data = {
-            "url": "https://example.com",
-            "link_count": 10,
-            "word_count": 500,
-            "image_count": 5
-        }
-        
-        visit = PageVisitCreate(**data)
-        
-        assert visit.url == "https://example.com"
-        assert visit.link_count == 10
-        assert visit.word_count == 500
-        assert visit.image_count == 5
-        assert visit.datetime_visited is None  # Optional
-    
-    def test_visit_with_timestamp(self):
-        """Test creating visit with timestamp."""
-        data = {
-            "url": "https://example.com",
-            "datetime_visited": datetime(2024, 1, 15, 10, 30, 0),
-            "link_count": 10,
-            "word_count": 500,
-            "image_count": 5
-        }
-        
+    @pytest.mark.parametrize("data", VALID_CASES)
+    def test_valid_visit_create(self, data):
+        """Test valid payloads round-trip, with datetime_visited optional."""
         visit = PageVisitCreate(**data)
         
-        assert visit.datetime_visited == datetime(2024, 1, 15, 10, 30, 0)
+        assert visit.model_dump() == {"datetime_visited": None, **data}
     
-    def test_missing_required_fields(self):
-        """Test validation fails with missing required fields."""
-        data = {
-            "url": "https://example.com"
-            # Missing link_count, word_count, image_count
-        }
+    @pytest.mark.parametrize("timestamp", ["2024-01-15T10:30:00Z", "2024-01-15T12:30:00+02:00"])
+    def test_aware_timestamp_stored_as_naive_utc(self, timestamp):
+        """Test timezone-aware timestamps are converted to naive UTC."""
+        visit = PageVisitCreate(**{**BASE_CREATE, "datetime_visited": timestamp})
         
-        with pytest.raises(ValidationError) as exc_info:
-            PageVisitCreate(**data)
-        
-        errors = exc_info.value.errors()
-        error_fields = {error['loc'][0] for error in errors}
-        assert 'link_count' in error_fields
-        assert 'word_count' in error_fields
-        assert 'image_count' in error_fields
+        assert visit.datetime_visited == VISIT_TIME
+        assert visit.datetime_visited.tzinfo is None
     
-    def test_negative_counts_rejected(self):
-        """Test negative counts are rejected."""
-        data = {
-            "url": "https://example.com",
-            "link_count": -1,
-            "word_count": 500,
-            "image_count": 5
-        }
-        
+    @pytest.mark.parametrize("data,error_type,field", INVALID_CASES)
+    def test_invalid_visit_create(self, data, error_type, field):
+        """Test invalid payloads are rejected with the expected error."""
         with pytest.raises(ValidationError) as exc_info:
-            PageVisitCreate(**data)
+            CREATE_ADAPTER.validate_python(data)
         
-        errors = exc_info.value.errors()
-        assert any('greater than or equal to 0' in str(error) for error in errors)
+        errors = exc_info.value.errors(include_url=False, include_input=False, include_context=False)
+        assert any(e["type"] == error_type and e["loc"] == (field,) for e in errors)
     
-    def test_zero_counts_accepted(self):
-        """Test zero counts are valid."""
-        data = {
-            "url": "https://example.com",
-            "link_count": 0,
-            "word_count": 0,
-            "image_count": 0
-        }
-        
-        visit = PageVisitCreate(**data)
-        
-        assert visit.link_count == 0
-        assert visit.word_count == 0
-        assert visit.image_count == 0
+    def test_negative_count_message(self):
+        """Test the rejection message for a negative count is human-readable."""
+        with pytest.raises(ValidationError, match="greater than or equal to 0"):
+            PageVisitCreate(**{**BASE_CREATE, "link_count": -1})
     
-    def test_invalid_url_type(self):
-        """Test invalid URL type is rejected."""
-        data = {
-            "url": 12345,  # Not a string
-            "link_count": 10,
-            "word_count": 500,
-            "image_count": 5
-        }
+    def test_missing_required_fields(self, required_create_fields):
+        """Test validation fails with missing required fields."""
+        data = {"url": BASE_CREATE["url"]}  # Missing link_count, word_count, image_count
         
-        with pytest.raises(ValidationError):
-            PageVisitCreate(**data)
-    
-    def test_invalid_count_types(self):
-        """Test invalid count types are rejected."""
-        data = {
-            "url": "https://example.com",
-            "link_count": "ten",  # Not an integer
-            "word_count": 500,
-            "image_count": 5
-        }
+        with pytest.raises(ValidationError) as exc_info:
+            CREATE_ADAPTER.validate_python(data)
         
-        with pytest.raises(ValidationError):
-            PageVisitCreate(**data)
+        errors = exc_info.value.errors(include_url=False, include_input=False, include_context=False)
+        error_fields = set(map(itemgetter(0), map(itemgetter("loc"), errors)))
+        assert error_fields == required_create_fields - {"url"}
+        assert error_fields == {"link_count", "word_count", "image_count"}
 
 
 class TestPageVisitResponse:
     """Test PageVisitResponse schema."""
     
-    def test_visit_response_from_dict(self):
-        """Test creating PageVisitResponse from dict."""
-        data = {
-            "id": "550e8400-e29b-41d4-a716-446655440000",
-            "url": "https://example.com",
-            "datetime_visited": datetime(2024, 1, 15, 10, 30, 0),
-            "link_count": 10,
-            "word_count": 500,
-            "image_count": 5,
-            "created_at": datetime(2024, 1, 15, 10, 30, 0)
-        }
-        
-        response = PageVisitResponse(**data)
+    def test_visit_response_from_dict(self, sample_response):
+        """Test creating PageVisitResponse from dict parses the id string."""
+        response = PageVisitResponse(**RESPONSE_DATA)
         
+        assert response == sample_response
         assert str(response.id) == "550e8400-e29b-41d4-a716-446655440000"
-        assert response.url == "https://example.com"
-        assert response.link_count == 10
+    
+    def test_visit_list_adapter_from_attributes(self):
+        """Test the list adapter validates objects by attribute and dumps JSON-ready dicts."""
+        visit = SimpleNamespace(**RESPONSE_DATA)
+        
+        visits = visit_list_adapter.validate_python([visit], from_attributes=True)
+        dumped = visit_list_adapter.dump_python(visits, mode="json")
+        
+        assert dumped[0]["id"] == "550e8400-e29b-41d4-a716-446655440000"
+        assert dumped[0]["datetime_visited"] == "2024-01-15T10:30:00"
 
 
 class TestPageVisitList:
     """Test PageVisitList schema."""
     
-    def test_visit_list(self):
-        """Test creating PageVisitList."""
-        visit_data = {
-            "id": "550e8400-e29b-41d4-a716-446655440000",
-            "url": "https://example.com",
-            "datetime_visited": datetime(2024, 1, 15, 10, 30, 0),
-            "link_count": 10,
-            "word_count": 500,
-            "image_count": 5,
-            "created_at": datetime(2024, 1, 15, 10, 30, 0)
-        }
-        
-        visit = PageVisitResponse(**visit_data)
-        
-        visit_list = PageVisitList(visits=[visit], total=1)
-        
-        assert len(visit_list.visits) == 1
-        assert visit_list.total == 1
-    
-    def test_empty_visit_list(self):
-        """Test creating empty PageVisitList."""
-        visit_list = PageVisitList(visits=[], total=0)
+    @pytest.mark.parametrize("total", [1, 0], ids=["one_visit", "empty"])
+    def test_visit_list(self, sample_response, total):
+        """Test creating PageVisitList, including an empty one."""
+        visit_list = PageVisitList(visits=[sample_response] * total, total=total)
         
-        assert len(visit_list.visits) == 0
-        assert visit_list.total == 0
\ No newline at end of file
+        assert len(visit_list.visits) == total
+        assert visit_list.total == total
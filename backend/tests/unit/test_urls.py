@@ -0,0 +1,34 @@
+"""
+Unit tests for URL normalization.
+"""
+from app.urls import decode_url, normalize_url
+
+
+class TestNormalizeUrl:
+    """Test normalize_url function."""
+
+    def test_lowercases_scheme_and_host(self):
+        """Test scheme and host are lowercased."""
+        assert normalize_url("HTTPS://Example.COM/Path") == "https://example.com/Path"
+
+    def test_keeps_path_query_and_fragment(self):
+        """Test case-sensitive parts and trailing delimiters are preserved."""
+        url = "https://example.com/A/?Q=1#Frag"
+        assert normalize_url(url) == url
+        assert normalize_url("https://example.com/page?") == "https://example.com/page?"
+
+    def test_keeps_userinfo_case(self):
+        """Test only the host part of the netloc is lowercased."""
+        assert normalize_url("https://User@Example.com/") == "https://User@example.com/"
+
+    def test_returns_unparseable_url_unchanged(self):
+        """Test URLs urlsplit rejects are passed through instead of raising."""
+        assert normalize_url("HTTP://[abc") == "HTTP://[abc"
+
+
+class TestDecodeUrl:
+    """Test decode_url function."""
+
+    def test_decodes_and_normalizes(self):
+        """Test percent-encoded path parameters are decoded then normalized."""
+        assert decode_url("https%3A%2F%2FExample.com%2Fa%20b") == "https://example.com/a b"
@@ -49,6 +49,7 @@ export interface PageVisitResponse {
 export interface PageVisitListResponse {
   visits: PageVisitResponse[];
   total: number;
+  next_cursor?: { after: string; after_id: string } | null;
 }
 
 /**
@@ -64,7 +64,6 @@ echo ""
 
 # Run database migrations
 echo "Running database migrations..."
-docker-compose exec -T backend alembic revision --autogenerate -m "Initial migration"
 docker-compose exec -T backend alembic upgrade head
 echo "Database migrations completed"
 echo ""